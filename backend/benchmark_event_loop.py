@@ -0,0 +1,116 @@
+"""
+Event-loop latency benchmark: GET /movies while logins hammer bcrypt.
+
+Runs the FastAPI app in-process and, for a fixed time, keeps `--logins`
+concurrent clients calling /auth/login-json while a prober requests /movies
+every 10 ms. Reported /movies latency is mostly time spent waiting for the
+event loop, so it shows whether blocking work runs on the loop.
+
+Two runs are made: "inline" (STORAGE_THREADS=0, CRYPTO_THREADS=0, the old
+behaviour) and "pooled" (the configured or default pool sizes).
+Users live in a throwaway SQLite file, so no records in backend/data are
+written; importing the app still creates its lock files there and the
+bookings.history/ index if it is missing.
+Run from backend/: python benchmark_event_loop.py [--logins 16] [--seconds 5]
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+# Point the users collection at a scratch database before the app is imported.
+SCRATCH = Path(tempfile.mkdtemp(prefix="bench-loop-"))
+os.environ["USERS_STORAGE"] = "sqlite"
+os.environ["SQLITE_PATH"] = str(SCRATCH / "bench.db")
+
+import httpx  # noqa: E402
+
+from main import app  # noqa: E402
+from models.user import UserCreate  # noqa: E402
+from routes.auth import auth_service  # noqa: E402
+from services.executors import shutdown_executors  # noqa: E402
+
+EMAIL = "bench@example.com"
+PASSWORD = "bench-password"
+PROBE_INTERVAL = 0.01
+
+
+def _percentile(samples, pct: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+
+async def _scenario(logins: int, seconds: float) -> dict:
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        stop = time.perf_counter() + seconds
+        login_count = 0
+        latencies = []
+
+        async def login_loop():
+            nonlocal login_count
+            while time.perf_counter() < stop:
+                r = await client.post("/auth/login-json", json={"email": EMAIL, "password": PASSWORD})
+                r.raise_for_status()
+                login_count += 1
+
+        async def probe_loop():
+            # Latency is measured from when the request was due, not when the
+            # (possibly stalled) loop got round to sending it.
+            due = time.perf_counter()
+            while due < stop:
+                delay = due - time.perf_counter()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+                r = await client.get("/movies/")
+                r.raise_for_status()
+                done = time.perf_counter()
+                latencies.append((done - due) * 1000)
+                due = max(due + PROBE_INTERVAL, done)
+
+        await asyncio.gather(probe_loop(), *(login_loop() for _ in range(logins)))
+
+    return {
+        "requests": len(latencies),
+        "p50": statistics.median(latencies),
+        "p99": _percentile(latencies, 99),
+        "max": max(latencies),
+        "logins_per_s": login_count / seconds,
+    }
+
+
+def run(label: str, storage_threads: str, crypto_threads: str, logins: int, seconds: float) -> dict:
+    os.environ["STORAGE_THREADS"] = storage_threads
+    os.environ["CRYPTO_THREADS"] = crypto_threads
+    shutdown_executors()  # pick up the new sizes
+    result = asyncio.run(_scenario(logins, seconds))
+    print(f"[{label}] storage={storage_threads} crypto={crypto_threads}: "
+          f"/movies p50 {result['p50']:.1f} ms, p99 {result['p99']:.1f} ms, max {result['max']:.1f} ms "
+          f"over {result['requests']} requests; {result['logins_per_s']:.1f} logins/s")
+    return result
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="/movies latency under concurrent login load")
+    parser.add_argument("--logins", type=int, default=16, help="Concurrent login clients")
+    parser.add_argument("--seconds", type=float, default=5.0, help="Duration of each run")
+    args = parser.parse_args()
+
+    auth_service.create_user(UserCreate(username="bench", email=EMAIL, password=PASSWORD))
+
+    before = run("inline", "0", "0", args.logins, args.seconds)
+    after = run("pooled", os.getenv("BENCH_STORAGE_THREADS", "4"), os.getenv("BENCH_CRYPTO_THREADS", "2"),
+                args.logins, args.seconds)
+    print(f"/movies p99: {before['p99']:.1f} ms -> {after['p99']:.1f} ms")
+    shutdown_executors()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,78 @@
+"""
+Serialization benchmark for the whole-file stores.
+
+Generates synthetic booking records and, for each data format, times a full
+save (encode + write) and a full load (read + decode) through
+JsonRepository, and reports the file size.
+Run from backend/: python benchmark_serializers.py [--sizes 10000,100000,1000000]
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+import uuid
+from pathlib import Path
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from services.repository import JsonRepository
+from services.seat_map import ALL_SEATS
+from services.serializers import SERIALIZERS, get_serializer, msgpack
+
+SHOWTIMES = ["10:00 AM", "1:00 PM", "4:00 PM", "7:00 PM", "10:00 PM"]
+
+
+def _records(count: int, seed: int = 7) -> list:
+    rng = random.Random(seed)
+    records = []
+    for _ in range(count):
+        seats = rng.sample(ALL_SEATS, rng.randint(1, 4))
+        records.append({
+            "id": str(uuid.UUID(int=rng.getrandbits(128))),
+            "user_id": str(uuid.UUID(int=rng.getrandbits(128))),
+            "movie_id": f"movie-{rng.randint(1, 6)}",
+            "movie_title": "Avengers: Endgame",
+            "showtime": rng.choice(SHOWTIMES),
+            "seats": seats,
+            "total_price": 12.0 * len(seats),
+            "booking_date": "2025-09-29T19:38:49.887943",
+            "status": rng.choice(["confirmed", "confirmed", "cancelled"]),
+        })
+    return records
+
+
+def _time(func) -> float:
+    start = time.perf_counter()
+    func()
+    return (time.perf_counter() - start) * 1000
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Load/save time and size per data format")
+    parser.add_argument("--sizes", default="10000,100000,1000000",
+                        help="Comma-separated record counts")
+    args = parser.parse_args()
+
+    formats = [name for name in SERIALIZERS if name != "msgpack" or msgpack is not None]
+    if "msgpack" not in formats:
+        print("msgpack not installed; skipping that format (pip install msgpack)")
+
+    scratch = Path(tempfile.mkdtemp(prefix="bench-serializers-"))
+    print(f"{'records':>9}  {'format':<8} {'save ms':>9} {'load ms':>9} {'size MB':>9}")
+    for size in (int(s) for s in args.sizes.split(",")):
+        records = _records(size)
+        for name in formats:
+            path = scratch / f"{name}-{size}.json"
+            repo = JsonRepository(path, get_serializer(name))
+            save_ms = _time(lambda: repo.replace_all(records))
+            load_ms = _time(repo.load_all)
+            mb = path.stat().st_size / 1e6
+            print(f"{size:>9}  {name:<8} {save_ms:>9.1f} {load_ms:>9.1f} {mb:>9.2f}")
+            path.unlink()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,3 +1,10 @@
+import asyncio
+import logging
+import os
+import time
+from contextlib import asynccontextmanager
+from typing import Dict, Tuple
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
@@ -12,8 +19,79 @@ from routes.auth import router as auth_router
 from routes.bookings import router as bookings_router
 from routes.movies import router as movies_router
 from routes.voice import router as voice_router
+from routes.movies import movie_service
+from services.booking_service import get_booking_service
+from services.executors import run_storage, shutdown_executors
+
+logger = logging.getLogger(__name__)
+
+# Seconds between background booking-store compactions; 0 disables them.
+COMPACT_INTERVAL = float(os.getenv("BOOKINGS_COMPACT_INTERVAL", "0"))
+# Seconds between background retirements of showings that left the
+# schedule (0 disables them), and how long a showing must have been off the
+# schedule before its bookings are retired.
+RETIRE_INTERVAL = float(os.getenv("BOOKINGS_RETIRE_INTERVAL", "0"))
+RETIRE_GRACE = float(os.getenv("BOOKINGS_RETIRE_GRACE", "86400"))
+
+
+def _compact_bookings():
+    """Archive dead bookings."""
+    return get_booking_service().compact()
+
+
+class _Retirer:
+    """
+    Retires showings once they have been off the schedule for RETIRE_GRACE seconds.
+
+    A movie taken out of movies.json and put back within the grace period
+    keeps its bookings live. The clock restarts with the process, which can
+    only delay a retirement, never bring one forward.
+    """
+
+    def __init__(self, grace: float):
+        self.grace = grace
+        # (movie_id, showtime) -> monotonic time it was first seen unscheduled
+        self._missing_since: Dict[Tuple[str, str], float] = {}
+
+    def __call__(self):
+        bookings = get_booking_service()
+        now = time.monotonic()
+        scheduled = movie_service.get_scheduled_showings()
+        unscheduled = bookings.get_booked_showings() - scheduled
+        self._missing_since = {key: self._missing_since.get(key, now) for key in unscheduled}
+        waiting = {key for key, since in self._missing_since.items() if now - since < self.grace}
+        if waiting == unscheduled:
+            return {"retired": 0, "waiting": len(waiting)}
+        report = bookings.retire_showings(scheduled | waiting)
+        report["waiting"] = len(waiting)
+        return report
+
+
+async def _run_periodically(name: str, job, interval: float):
+    """Run `job` on the storage pool every `interval` seconds."""
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            report = await run_storage(job)
+            logger.info("Booking %s: %s", name, report)
+        except Exception:
+            logger.exception("Booking %s failed", name)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    tasks = []
+    if COMPACT_INTERVAL > 0:
+        tasks.append(asyncio.create_task(_run_periodically("compaction", _compact_bookings, COMPACT_INTERVAL)))
+    if RETIRE_INTERVAL > 0:
+        tasks.append(asyncio.create_task(_run_periodically("retirement", _Retirer(RETIRE_GRACE), RETIRE_INTERVAL)))
+    yield
+    for task in tasks:
+        task.cancel()
+    shutdown_executors()
+
 
-app = FastAPI(title="TalkNBook API", description="Movie booking application API")
+app = FastAPI(title="TalkNBook API", description="Movie booking application API", lifespan=lifespan)
 
 
 # Add CORS middleware
@@ -23,6 +101,8 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    # Lets the frontend read ETags for conditional requests (routes/caching.py)
+    expose_headers=["ETag"],
 )
 
 # Include routers
@@ -0,0 +1,151 @@
+"""
+Maintenance commands for the TalkNBook data store.
+
+Usage (from backend/):
+    python manage.py migrate-sqlite              # import data/*.json into SQLite
+    python manage.py migrate-sqlite --force      # replace rows already in the DB
+    python manage.py compact                     # archive dead bookings, rewrite snapshot
+    python manage.py compact --drop              # delete dead bookings instead
+    python manage.py retire                      # archive showings no longer in movies.json
+    python manage.py convert --format msgpack    # rewrite data files in another format
+    python manage.py convert --format pretty users movies
+"""
+
+import argparse
+import os
+import sys
+from contextlib import ExitStack
+from pathlib import Path
+
+# Make sibling packages (services/, models/) importable regardless of cwd.
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+from services.repository import COLLECTIONS, DEFAULT_DATA_DIR, JsonRepository, get_repository, sqlite_path  # noqa: E402
+from services.booking_journal import BookingJournal  # noqa: E402
+from services.occupancy_map import shared_occupancy_from_env  # noqa: E402
+from services.serializers import SERIALIZERS, detect_format, get_serializer  # noqa: E402
+
+
+def migrate_sqlite(args: argparse.Namespace) -> int:
+    """Copy every JSON collection (bookings via its journal, if any) into SQLite."""
+    data_dir = Path(args.data_dir)
+    print(f"Migrating {data_dir} -> {sqlite_path(data_dir)}")
+    for collection in COLLECTIONS:
+        source_backend = "json"
+        if collection == "bookings" and (data_dir / "bookings.journal").exists():
+            source_backend = "journal"
+        records = get_repository(collection, data_dir, source_backend).load_all()
+        target = get_repository(collection, data_dir, "sqlite")
+        existing = len(target.load_all())
+        if existing and not args.force:
+            print(f"  {collection}: skipped, {existing} rows already present (use --force)")
+            continue
+        target.replace_all(records)
+        print(f"  {collection}: {len(records)} records")
+    print("Done. Set STORAGE_BACKEND=sqlite to use the database.")
+    return 0
+
+
+def compact(args: argparse.Namespace) -> int:
+    """Rewrite the booking store with live bookings only and report the savings."""
+    from services.booking_service import BookingService
+
+    service = BookingService(Path(args.data_dir))
+    report = service.compact(archive=not args.drop)
+    moved = report.get("archived", report.get("dropped"))
+    print(f"Live bookings:   {report['live']}")
+    print(f"{'Dropped' if args.drop else 'Archived'}:        {moved}")
+    print(f"Size:            {report['bytes_before']} -> {report['bytes_after']} bytes "
+          f"({report['bytes_reclaimed']} reclaimed)")
+    print(f"Full load:       {report['load_ms_before']:.2f} ms -> {report['load_ms_after']:.2f} ms")
+    return 0
+
+
+def retire(args: argparse.Namespace) -> int:
+    """Move bookings of unscheduled showings into compressed segments."""
+    from services.booking_service import BookingService
+    from services.movie_service import MovieService
+
+    data_dir = Path(args.data_dir)
+    report = BookingService(data_dir).retire_showings(MovieService(data_dir).get_scheduled_showings())
+    print(f"Live bookings:   {report['live']}")
+    print(f"Retired:         {report['retired']}")
+    for segment in report["segments"]:
+        print(f"  wrote {segment}")
+    return 0
+
+
+def convert(args: argparse.Namespace) -> int:
+    """Rewrite whole-file collections in another format (loading auto-detects it)."""
+    data_dir = Path(args.data_dir)
+    serializer = get_serializer(args.format)
+    shared = shared_occupancy_from_env()
+    unknown = set(args.collections) - set(COLLECTIONS)
+    if unknown:
+        print(f"Unknown collections: {', '.join(sorted(unknown))}")
+        return 2
+    for collection in args.collections or list(COLLECTIONS):
+        path = data_dir / f"{collection}.json"
+        if not path.exists():
+            print(f"  {collection}: no {path.name}, skipped")
+            continue
+        repo = JsonRepository(path, serializer)
+        journal = data_dir / f"{collection}.journal"
+        if journal.exists():
+            # Fold the journal in; rewriting bookings.json under it would orphan it
+            repo = BookingJournal(journal, repo)
+        with ExitStack() as locks:
+            # Exclude a running server: it writes under the store's lock, or
+            # for bookings under the shared occupancy file's when configured.
+            if collection == "bookings" and shared is not None:
+                locks.enter_context(shared.lock())
+            locks.enter_context(repo.lock())
+            before = path.stat().st_size
+            old_format = detect_format(path.read_bytes())
+            repo.replace_all(repo.load_all())
+        print(f"  {collection}: {old_format} -> {args.format}, {before} -> {path.stat().st_size} bytes")
+    print(f"Done. Set DATA_FORMAT={args.format} so new writes keep this format.")
+    if args.format == "msgpack":
+        print("The files keep their .json names but now hold binary MessagePack.")
+    return 0
+
+
+def _parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="TalkNBook data maintenance")
+    parser.add_argument("--data-dir", default=str(DEFAULT_DATA_DIR),
+                        help="Directory holding the data files (default: backend/data)")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    migrate = sub.add_parser("migrate-sqlite", help="Import data/*.json into the SQLite database")
+    migrate.add_argument("--force", action="store_true",
+                         help="Overwrite collections that already have rows")
+    migrate.set_defaults(func=migrate_sqlite)
+
+    compact_cmd = sub.add_parser("compact", help="Snapshot live bookings and archive the rest")
+    compact_cmd.add_argument("--drop", action="store_true",
+                             help="Delete cancelled/empty bookings instead of archiving them")
+    compact_cmd.set_defaults(func=compact)
+
+    retire_cmd = sub.add_parser("retire", help="Archive bookings of showings no longer on the schedule")
+    retire_cmd.set_defaults(func=retire)
+
+    convert_cmd = sub.add_parser("convert", help="Rewrite data files in another serialization format")
+    convert_cmd.add_argument("--format", required=True, choices=sorted(SERIALIZERS))
+    convert_cmd.add_argument("collections", nargs="*",
+                             help=f"Collections to convert (default: all of {', '.join(COLLECTIONS)})")
+    convert_cmd.set_defaults(func=convert)
+
+    return parser.parse_args()
+
+
+def main() -> int:
+    args = _parse_args()
+    return args.func(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
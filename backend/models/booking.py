@@ -12,6 +12,27 @@ class BookingCreate(BaseModel):
     total_price: float
 
 
+class BatchBookingCreate(BaseModel):
+    """Model for creating several bookings in one atomic request."""
+    bookings: List[BookingCreate]
+
+
+class SeatHoldCreate(BookingCreate):
+    """Model for a temporary seat hold request."""
+    ttl_seconds: Optional[int] = None
+
+
+class SeatHoldResponse(BaseModel):
+    """Model for a seat hold response."""
+    id: str
+    movie_id: str
+    movie_title: str
+    showtime: str
+    seats: List[str]
+    total_price: float
+    expires_in: float
+
+
 class BookingResponse(BaseModel):
     """Model for booking response."""
     id: str
@@ -23,6 +44,7 @@ class BookingResponse(BaseModel):
     total_price: float
     booking_date: datetime
     status: str = "confirmed"
+    version: int = 0
 
 
 class BookedSeatsRequest(BaseModel):
@@ -36,6 +58,24 @@ class BookedSeatsResponse(BaseModel):
     movie_id: str
     showtime: str
     booked_seats: List[str]
+    held_seats: List[str] = []
+
+
+class ShowtimeOccupancy(BaseModel):
+    """Occupancy of one showing in a bulk occupancy response."""
+    showtime: str
+    free_seats: int
+    booked_count: int
+    held_count: int
+    booked_seats: Optional[List[str]] = None
+    held_seats: Optional[List[str]] = None
+
+
+class MovieOccupancy(BaseModel):
+    """Occupancy of every showtime of one movie."""
+    movie_id: str
+    total_seats: int
+    showtimes: List[ShowtimeOccupancy]
 
 
 class CancelSeatsRequest(BaseModel):
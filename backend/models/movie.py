@@ -25,4 +25,11 @@ class MovieResponse(BaseModel):
     description: str
     image: str
     showtimes: List[str]
-    price: float
\ No newline at end of file
+    price: float
+
+
+class MovieSuggestion(BaseModel):
+    """Model for one autocomplete suggestion (kept small: sent per keystroke)."""
+    id: str
+    title: str
+    rating: str
@@ -25,7 +25,7 @@ async def get_current_user(token: Annotated[str, Depends(oauth2_scheme)]) -> dic
     if email is None:
         raise credentials_exception
     
-    user = auth_service.get_user_by_email(email)
+    user = await auth_service.get_user_by_email_async(email)
     if user is None:
         raise credentials_exception
     
@@ -36,7 +36,7 @@ async def get_current_user(token: Annotated[str, Depends(oauth2_scheme)]) -> dic
 async def signup(user_data: UserCreate):
     """Create a new user account."""
     try:
-        user = auth_service.create_user(user_data)
+        user = await auth_service.create_user_async(user_data)
         
         # Create access token
         access_token_expires = timedelta(minutes=auth_service.ACCESS_TOKEN_EXPIRE_MINUTES)
@@ -65,7 +65,7 @@ async def signup(user_data: UserCreate):
 @router.post("/login", response_model=dict)
 async def login(form_data: OAuth2PasswordRequestForm = Depends()):
     """Login user and return access token."""
-    user = auth_service.authenticate_user(form_data.username, form_data.password)
+    user = await auth_service.authenticate_user_async(form_data.username, form_data.password)
     if not user:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -92,7 +92,7 @@ async def login(form_data: OAuth2PasswordRequestForm = Depends()):
 @router.post("/login-json", response_model=dict)
 async def login_json(user_data: UserLogin):
     """Login user with JSON body and return access token."""
-    user = auth_service.authenticate_user(user_data.email, user_data.password)
+    user = await auth_service.authenticate_user_async(user_data.email, user_data.password)
     if not user:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -1,14 +1,42 @@
-from typing import Annotated, List
+import asyncio
+import json
+from typing import Annotated, Any, Dict, List, Optional
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, WebSocket, WebSocketDisconnect, status
+from fastapi.responses import StreamingResponse
 
-from models.booking import BookingCreate, BookingResponse, BookedSeatsRequest, BookedSeatsResponse, CancelSeatsRequest
-from services.booking_service import BookingService
-from routes.auth import get_current_user
+from models.booking import (
+    BatchBookingCreate,
+    BookingCreate,
+    BookingResponse,
+    BookedSeatsRequest,
+    BookedSeatsResponse,
+    CancelSeatsRequest,
+    MovieOccupancy,
+    SeatHoldCreate,
+    SeatHoldResponse,
+    ShowtimeOccupancy,
+)
+from services.booking_service import get_booking_service
+from routes.auth import auth_service, get_current_user
+from routes.caching import make_etag, not_modified
+from routes.movies import movie_service
+from services.executors import run_storage
+from services.occupancy_hub import get_occupancy_hub
+from services.seat_holds import DEFAULT_HOLD_TTL
+from services.seat_map import SEAT_COUNT, free_count, mask_to_seats, seat_count
 
 
 router = APIRouter(prefix="/bookings", tags=["bookings"])
-booking_service = BookingService()
+booking_service = get_booking_service()
+occupancy_hub = get_occupancy_hub()
+
+# Seconds between keepalives on an idle stream; at most this often the
+# showing is also re-read for lapsed holds and other workers' bookings.
+STREAM_REFRESH_SECONDS = 5.0
+# Seconds between renewals of the holds behind a seat channel's selection;
+# well inside the hold TTL, so an open channel never lets one lapse.
+CHANNEL_RENEW_SECONDS = DEFAULT_HOLD_TTL / 4
 
 
 @router.post("/", response_model=BookingResponse)
@@ -18,7 +46,7 @@ async def create_booking(
 ):
     """Create a new booking for the authenticated user."""
     try:
-        booking = booking_service.create_booking(booking_data, current_user["id"])
+        booking = await booking_service.create_booking_async(booking_data, current_user["id"])
         return BookingResponse(**booking)
     except ValueError as e:
         raise HTTPException(
@@ -32,13 +60,34 @@ async def create_booking(
         )
 
 
+@router.post("/batch", response_model=List[BookingResponse])
+async def create_bookings_batch(
+    batch: BatchBookingCreate,
+    current_user: Annotated[dict, Depends(get_current_user)]
+):
+    """Create several bookings at once; either all of them succeed or none do."""
+    try:
+        bookings = await booking_service.create_bookings_async(batch.bookings, current_user["id"])
+        return [BookingResponse(**booking) for booking in bookings]
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Failed to create bookings"
+        )
+
+
 @router.get("/", response_model=List[BookingResponse])
 async def get_user_bookings(
     current_user: Annotated[dict, Depends(get_current_user)]
 ):
     """Get all bookings for the authenticated user."""
     try:
-        bookings = booking_service.get_user_bookings(current_user["id"])
+        bookings = await booking_service.get_user_bookings_async(current_user["id"])
         return [BookingResponse(**booking) for booking in bookings]
     except Exception as e:
         raise HTTPException(
@@ -48,14 +97,25 @@ async def get_user_bookings(
 
 
 @router.post("/booked-seats", response_model=BookedSeatsResponse)
-async def get_booked_seats(request: BookedSeatsRequest):
-    """Get all booked seats for a specific movie and showtime."""
+async def get_booked_seats(body: BookedSeatsRequest, request: Request, response: Response):
+    """
+    Get all booked seats for a specific movie and showtime.
+    
+    Answers 304 when If-None-Match has the ETag of the current occupancy.
+    """
     try:
-        booked_seats = booking_service.get_booked_seats(request.movie_id, request.showtime)
+        # Version before data: a change in between only costs the client a later 200
+        version = await booking_service.get_occupancy_version_async(body.movie_id, body.showtime)
+        cached = not_modified(request, response, make_etag("booked-seats", body.movie_id, body.showtime, version))
+        if cached:
+            return cached
+        booked_seats = await booking_service.get_booked_seats_async(body.movie_id, body.showtime)
+        held_seats = await booking_service.get_held_seats_async(body.movie_id, body.showtime)
         return BookedSeatsResponse(
-            movie_id=request.movie_id,
-            showtime=request.showtime,
-            booked_seats=booked_seats
+            movie_id=body.movie_id,
+            showtime=body.showtime,
+            booked_seats=booked_seats,
+            held_seats=held_seats
         )
     except Exception as e:
         raise HTTPException(
@@ -64,13 +124,265 @@ async def get_booked_seats(request: BookedSeatsRequest):
         )
 
 
+@router.get("/occupancy", response_model=List[MovieOccupancy], response_model_exclude_none=True)
+async def get_bulk_occupancy(
+    movie_id: Optional[List[str]] = Query(None, description="Movies to include (default: whole catalog)"),
+    counts_only: bool = Query(False, description="Only return seat counts, not seat IDs")
+):
+    """Occupancy for every showtime of one, several or all movies in one call."""
+    try:
+        movies = await movie_service.get_all_movies_async()
+        if movie_id:
+            by_id = {m["id"]: m for m in movies}
+            movies = [by_id[mid] for mid in movie_id if mid in by_id]
+        
+        showings = [(m["id"], showtime) for m in movies for showtime in m["showtimes"]]
+        occupancy = await booking_service.get_occupancy_async(showings)
+        
+        result = []
+        for movie in movies:
+            showtimes = []
+            for showtime in movie["showtimes"]:
+                booked, held = occupancy[(movie["id"], showtime)]
+                entry = ShowtimeOccupancy(
+                    showtime=showtime,
+                    free_seats=free_count(booked | held),
+                    booked_count=seat_count(booked),
+                    held_count=seat_count(held),
+                )
+                if not counts_only:
+                    entry.booked_seats = mask_to_seats(booked)
+                    entry.held_seats = mask_to_seats(held)
+                showtimes.append(entry)
+            result.append(MovieOccupancy(movie_id=movie["id"], total_seats=SEAT_COUNT, showtimes=showtimes))
+        return result
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Failed to retrieve occupancy"
+        )
+
+
+@router.get("/commit-stats")
+async def get_commit_stats():
+    """Group-commit batch-size histogram (see BOOKINGS_GROUP_COMMIT_MS)."""
+    stats = booking_service.commit_stats()
+    if stats is None:
+        return {"enabled": False}
+    return {"enabled": True, **stats}
+
+
+@router.get("/stream")
+async def stream_occupancy(
+    request: Request,
+    movie_id: str = Query(..., description="Movie to watch"),
+    showtime: str = Query(..., description="Showtime to watch")
+):
+    """
+    Server-Sent Events for one showing's seat map.
+    
+    Sends a "snapshot" event with the booked and held seats, then a "delta"
+    event (seats booked, unbooked, held and released) after every change.
+    Event ids are per-showing sequence numbers.
+    """
+    key = (movie_id, showtime)
+    subscription = occupancy_hub.subscribe(key)
+    
+    async def events():
+        try:
+            # Publishes the current state, which reaches the new subscriber as a snapshot
+            await run_storage(booking_service.refresh_showings, [key])
+            while not await request.is_disconnected():
+                message = await subscription.next(STREAM_REFRESH_SECONDS)
+                if message is not None:
+                    yield message.sse
+                    continue
+                if occupancy_hub.due_for_refresh(key, STREAM_REFRESH_SECONDS):
+                    await run_storage(booking_service.refresh_showings, [key])
+                yield ": keepalive\n\n"
+        finally:
+            subscription.close()
+    
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+async def _seat_intent(intent: Any, movie: Dict[str, Any], showtime: str, user_id: str) -> Dict[str, Any]:
+    """Apply one select/deselect message from a seat channel and build the reply."""
+    if not isinstance(intent, dict) or intent.get("op") not in ("select", "deselect") \
+            or not isinstance(intent.get("seats"), list) or not all(isinstance(s, str) for s in intent["seats"]):
+        return {"type": "error", "error": 'Expected {"op": "select" | "deselect", "seats": [...]}'}
+    
+    op, seats = intent["op"], intent["seats"]
+    reply: Dict[str, Any] = {"type": "ack", "op": op, "seats": seats, "ok": True}
+    try:
+        if op == "select":
+            await booking_service.hold_seats_async(
+                SeatHoldCreate(
+                    movie_id=movie["id"],
+                    movie_title=movie["title"],
+                    showtime=showtime,
+                    seats=seats,
+                    total_price=movie.get("price", 12.0) * len(set(seats)),
+                ),
+                user_id,
+            )
+        else:
+            await booking_service.release_held_seats_async(movie["id"], showtime, seats, user_id)
+    except ValueError as e:
+        reply.update(ok=False, error=str(e))
+    reply["selected"] = await booking_service.get_user_held_seats_async(movie["id"], showtime, user_id)
+    return reply
+
+
+@router.websocket("/ws")
+async def seat_channel(websocket: WebSocket, movie_id: str, showtime: str, token: str):
+    """
+    Live seat selection for one showing.
+    
+    Browsers cannot set headers on a WebSocket, so the access token comes
+    as ?token=. The server sends the same "snapshot" and "delta" events as
+    /bookings/stream (as JSON, with a "type" field). The client sends
+    {"op": "select" | "deselect", "seats": [...]}: selecting places a seat
+    hold, so two people racing for a seat are decided here, one getting
+    ok=false, instead of at checkout. Each intent gets an "ack" with the
+    seats the user now holds. The holds behind the selection are renewed
+    while the channel is open; if any lapse anyway, a "selection" message
+    carries the seats the user still holds. Seats selected over the
+    channel are released when it closes; booking them (POST /bookings/)
+    is unaffected by the user's own holds.
+    
+    A bad token or showing closes the channel with code 1008 and the
+    reason (accepted first, so browsers see the code rather than a failed
+    handshake).
+    """
+    email = auth_service.verify_token(token)
+    user = await auth_service.get_user_by_email_async(email) if email else None
+    movie = await movie_service.get_movie_by_id_async(movie_id)
+    await websocket.accept()
+    if user is None:
+        await websocket.close(code=status.WS_1008_POLICY_VIOLATION, reason="Invalid or expired token")
+        return
+    if movie is None or showtime not in movie.get("showtimes", []):
+        await websocket.close(code=status.WS_1008_POLICY_VIOLATION, reason="Unknown movie or showtime")
+        return
+    
+    key = (movie_id, showtime)
+    subscription = occupancy_hub.subscribe(key)
+    send_lock = asyncio.Lock()
+    # Seats this connection selected (the user may hold others via /holds)
+    selected: set = set()
+    
+    async def send(text: str):
+        async with send_lock:
+            await websocket.send_text(text)
+    
+    async def forward():
+        while True:
+            message = await subscription.next(STREAM_REFRESH_SECONDS)
+            if message is not None:
+                await send(message.json)
+            elif occupancy_hub.due_for_refresh(key, STREAM_REFRESH_SECONDS):
+                await run_storage(booking_service.refresh_showings, [key])
+    
+    async def renew():
+        while True:
+            await asyncio.sleep(CHANNEL_RENEW_SECONDS)
+            if not selected:
+                continue
+            seats = list(selected)
+            held = await booking_service.renew_held_seats_async(movie_id, showtime, seats, user["id"])
+            lapsed = set(seats) - set(held)
+            if lapsed:
+                selected.difference_update(lapsed)
+                reply = {"type": "selection", "selected": await booking_service.get_user_held_seats_async(
+                    movie_id, showtime, user["id"])}
+                await send(json.dumps(reply, separators=(",", ":")))
+    
+    forwarder = asyncio.create_task(forward())
+    renewer = asyncio.create_task(renew())
+    try:
+        await run_storage(booking_service.refresh_showings, [key])
+        while True:
+            text = await websocket.receive_text()
+            try:
+                intent = json.loads(text)
+            except ValueError:
+                intent = None
+            reply = await _seat_intent(intent, movie, showtime, user["id"])
+            if reply.get("ok"):
+                if reply["op"] == "select":
+                    selected.update(reply["seats"])
+                else:
+                    selected.difference_update(reply["seats"])
+            await send(json.dumps(reply, separators=(",", ":")))
+    except WebSocketDisconnect:
+        pass
+    finally:
+        forwarder.cancel()
+        renewer.cancel()
+        subscription.close()
+        if selected:
+            await booking_service.release_held_seats_async(movie_id, showtime, list(selected), user["id"])
+
+
+@router.post("/holds", response_model=SeatHoldResponse)
+async def hold_seats(
+    hold_data: SeatHoldCreate,
+    current_user: Annotated[dict, Depends(get_current_user)]
+):
+    """Hold seats for a short time (ttl_seconds) while the user checks out."""
+    try:
+        hold = await booking_service.hold_seats_async(hold_data, current_user["id"])
+        return SeatHoldResponse(**hold)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=str(e)
+        )
+
+
+@router.post("/holds/{hold_id}/confirm", response_model=BookingResponse)
+async def confirm_hold(
+    hold_id: str,
+    current_user: Annotated[dict, Depends(get_current_user)]
+):
+    """Turn a live hold into a confirmed booking."""
+    try:
+        booking = await booking_service.confirm_hold_async(hold_id, current_user["id"])
+        return BookingResponse(**booking)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+
+
+@router.delete("/holds/{hold_id}")
+async def release_hold(
+    hold_id: str,
+    current_user: Annotated[dict, Depends(get_current_user)]
+):
+    """Release a hold before it expires."""
+    if not await booking_service.release_hold_async(hold_id, current_user["id"]):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Hold not found or expired"
+        )
+    
+    return {"message": "Hold released"}
+
+
 @router.get("/{booking_id}", response_model=BookingResponse)
 async def get_booking(
     booking_id: str,
     current_user: Annotated[dict, Depends(get_current_user)]
 ):
     """Get a specific booking by ID."""
-    booking = booking_service.get_booking_by_id(booking_id)
+    booking = await booking_service.get_booking_by_id_async(booking_id)
     
     if not booking:
         raise HTTPException(
@@ -93,7 +405,10 @@ async def cancel_booking(
     current_user: Annotated[dict, Depends(get_current_user)]
 ):
     """Cancel a booking."""
-    success = booking_service.cancel_booking(booking_id, current_user["id"])
+    try:
+        success = await booking_service.cancel_booking_async(booking_id, current_user["id"])
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=str(e))
     
     if not success:
         raise HTTPException(
@@ -117,7 +432,10 @@ async def cancel_seats(
             detail="Booking ID in path must match booking ID in request body"
         )
     
-    result = booking_service.cancel_seats(booking_id, request.seats_to_cancel, current_user["id"])
+    try:
+        result = await booking_service.cancel_seats_async(booking_id, request.seats_to_cancel, current_user["id"])
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=str(e))
     
     if not result["success"]:
         raise HTTPException(
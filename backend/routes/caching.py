@@ -0,0 +1,34 @@
+import hashlib
+from typing import Optional
+
+from fastapi import Request, Response, status
+
+
+def make_etag(*versions: object) -> str:
+    """A strong ETag for a representation built from these version values."""
+    digest = hashlib.blake2b(repr(versions).encode(), digest_size=8).hexdigest()
+    return f'"{digest}"'
+
+
+def etag_matches(request: Request, etag: str) -> bool:
+    """Whether the request's If-None-Match names `etag` (weak comparison, per RFC 9110)."""
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    return any(tag.strip().removeprefix("W/") == etag for tag in header.split(","))
+
+
+def not_modified(request: Request, response: Response, etag: str) -> Optional[Response]:
+    """
+    Tag the response, and return a 304 to send instead if the client's copy is current.
+
+    Cache-Control: no-cache lets browsers and CDNs keep the body but makes
+    them revalidate it on every use, which is what turns polls into 304s.
+    """
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if etag_matches(request, etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    response.headers.update(headers)
+    return None
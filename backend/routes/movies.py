@@ -1,28 +1,35 @@
 from typing import List, Optional
 
-from fastapi import APIRouter, HTTPException, status, Query
+from fastapi import APIRouter, HTTPException, status, Query, Request, Response
 
-from models.movie import MovieResponse
-from services.movie_service import MovieService
+from models.movie import MovieResponse, MovieSuggestion
+from routes.caching import make_etag, not_modified
+from services.movie_service import get_movie_service
 
 
 router = APIRouter(prefix="/movies", tags=["movies"])
-movie_service = MovieService()
+movie_service = get_movie_service()
 
 
 @router.get("/", response_model=List[MovieResponse])
 async def get_movies(
+    request: Request,
+    response: Response,
     genre: Optional[str] = Query(None, description="Filter by genre"),
     search: Optional[str] = Query(None, description="Search movies by title or genre")
 ):
-    """Get all movies with optional filtering."""
+    """Get all movies with optional filtering (304 if the catalog is unchanged)."""
     try:
+        # Version before data: a change in between only costs the client a later 200
+        cached = not_modified(request, response, make_etag("movies", await movie_service.catalog_version_async()))
+        if cached:
+            return cached
         if search:
-            movies = movie_service.search_movies(search)
+            movies = await movie_service.search_movies_async(search)
         elif genre and genre.lower() != "all genres":
-            movies = movie_service.get_movies_by_genre(genre)
+            movies = await movie_service.get_movies_by_genre_async(genre)
         else:
-            movies = movie_service.get_all_movies()
+            movies = await movie_service.get_all_movies_async()
         
         return [MovieResponse(**movie) for movie in movies]
     except Exception as e:
@@ -32,10 +39,28 @@ async def get_movies(
         )
 
 
+@router.get("/suggest", response_model=List[MovieSuggestion])
+async def suggest_movies(
+    request: Request,
+    response: Response,
+    prefix: str = Query(..., description="What the user has typed so far"),
+    limit: int = Query(8, ge=1, le=20, description="Most suggestions to return")
+):
+    """Search-as-you-type: best-rated movies with a title word starting with `prefix`."""
+    cached = not_modified(request, response, make_etag("suggest", await movie_service.catalog_version_async()))
+    if cached:
+        return cached
+    movies = await movie_service.suggest_async(prefix, limit)
+    return [MovieSuggestion(id=m["id"], title=m["title"], rating=m["rating"]) for m in movies]
+
+
 @router.get("/{movie_id}", response_model=MovieResponse)
-async def get_movie(movie_id: str):
-    """Get a specific movie by ID."""
-    movie = movie_service.get_movie_by_id(movie_id)
+async def get_movie(movie_id: str, request: Request, response: Response):
+    """Get a specific movie by ID (304 if the catalog is unchanged)."""
+    cached = not_modified(request, response, make_etag("movie", await movie_service.catalog_version_async()))
+    if cached:
+        return cached
+    movie = await movie_service.get_movie_by_id_async(movie_id)
     
     if not movie:
         raise HTTPException(
@@ -8,6 +8,7 @@ from models.phone_user import (
     VoiceChatRequest,
     VoiceChatResponse,
 )
+from services.executors import run_storage
 from voice.runner import voice_runner
 from voice.tools import get_phone_auth_service
 
@@ -20,7 +21,7 @@ phone_auth = get_phone_auth_service()
 async def send_otp(body: OTPSendRequest):
     """Send a one-time code to a phone number (mock provider logs it)."""
     try:
-        return phone_auth.start_otp(body.phone_number)
+        return await run_storage(phone_auth.start_otp, body.phone_number)
     except ValueError as e:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
 
@@ -29,7 +30,7 @@ async def send_otp(body: OTPSendRequest):
 async def verify_otp(body: OTPVerifyRequest):
     """Verify a code and return the phone user record on success."""
     try:
-        result = phone_auth.verify_otp(body.phone_number, body.code)
+        result = await run_storage(phone_auth.verify_otp, body.phone_number, body.code)
     except ValueError as e:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
     if not result["success"]:
@@ -42,7 +43,8 @@ async def verify_otp(body: OTPVerifyRequest):
 async def link_phone(body: LinkPhoneRequest):
     """Link a phone number to an existing web-account user id."""
     try:
-        record = phone_auth.link_to_web_user(body.phone_number, body.user_id, body.name)
+        record = await run_storage(phone_auth.link_to_web_user, body.phone_number,
+                                   body.user_id, body.name)
     except ValueError as e:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
     return record
@@ -51,7 +53,7 @@ async def link_phone(body: LinkPhoneRequest):
 @router.get("/phone-users", response_model=list[PhoneUser])
 async def list_phone_users():
     """Debug helper — list every phone user on file."""
-    return phone_auth._load()
+    return await run_storage(phone_auth._load)
 
 
 @router.post("/chat", response_model=VoiceChatResponse)
@@ -1,7 +1,6 @@
-import json
-import os
 import uuid
 from datetime import datetime, timedelta
+from pathlib import Path
 from typing import Optional
 
 import bcrypt
@@ -9,6 +8,8 @@ from fastapi import HTTPException, status
 from jose import JWTError, jwt
 
 from models.user import UserCreate, UserLogin, UserResponse
+from services.executors import run_crypto, run_storage
+from services.repository import Repository, get_repository
 
 
 class AuthService:
@@ -18,29 +19,9 @@ class AuthService:
     ALGORITHM = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES = 30
 
-    def __init__(self):
-        self.db_path = os.path.join(os.path.dirname(__file__), "../data/users.json")
-        self._ensure_db_exists()
-    
-    def _ensure_db_exists(self):
-        """Ensure the users database file exists."""
-        os.makedirs(os.path.dirname(self.db_path), exist_ok=True)
-        if not os.path.exists(self.db_path):
-            with open(self.db_path, 'w') as f:
-                json.dump([], f)
-    
-    def _load_users(self) -> list:
-        """Load users from JSON file."""
-        try:
-            with open(self.db_path, 'r') as f:
-                return json.load(f)
-        except (FileNotFoundError, json.JSONDecodeError):
-            return []
-    
-    def _save_users(self, users: list):
-        """Save users to JSON file."""
-        with open(self.db_path, 'w') as f:
-            json.dump(users, f, indent=2, default=str)
+    def __init__(self, data_dir: Optional[Path] = None, repository: Optional[Repository] = None):
+        # users.json by default; see services/repository.py for other backends.
+        self._repo = repository or get_repository("users", data_dir)
     
     def verify_password(self, plain_password: str, hashed_password: str) -> bool:
         return bcrypt.checkpw(plain_password.encode(), hashed_password.encode())
@@ -50,24 +31,25 @@ class AuthService:
     
     def get_user_by_email(self, email: str) -> Optional[dict]:
         """Get user by email from database."""
-        users = self._load_users()
-        for user in users:
-            if user["email"] == email:
-                return user
-        return None
+        return self._repo.find_one("email", email)
     
     def get_user_by_username(self, username: str) -> Optional[dict]:
         """Get user by username from database."""
-        users = self._load_users()
-        for user in users:
-            if user["username"] == username:
-                return user
-        return None
+        return self._repo.find_one("username", username)
     
     def create_user(self, user_data: UserCreate) -> UserResponse:
         """Create a new user."""
-        users = self._load_users()
-        
+        self._ensure_available(user_data)
+        return self._insert_user(user_data, self.get_password_hash(user_data.password))
+    
+    async def create_user_async(self, user_data: UserCreate) -> UserResponse:
+        """create_user with storage and hashing off the event loop."""
+        await run_storage(self._ensure_available, user_data)
+        hashed_password = await run_crypto(self.get_password_hash, user_data.password)
+        return await run_storage(self._insert_user, user_data, hashed_password)
+    
+    def _ensure_available(self, user_data: UserCreate) -> None:
+        """Raise 400 if the email or username is already registered."""
         # Check if user already exists
         if self.get_user_by_email(user_data.email):
             raise HTTPException(
@@ -80,10 +62,10 @@ class AuthService:
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail="Username already taken"
             )
-        
-        # Create new user
+    
+    def _insert_user(self, user_data: UserCreate, hashed_password: str) -> UserResponse:
+        """Store a new user whose password is already hashed."""
         user_id = str(uuid.uuid4())
-        hashed_password = self.get_password_hash(user_data.password)
         
         new_user = {
             "id": user_id,
@@ -93,8 +75,11 @@ class AuthService:
             "created_at": datetime.utcnow().isoformat()
         }
         
-        users.append(new_user)
-        self._save_users(users)
+        # Check again under the store lock: another worker may have
+        # registered the same email or username since the first check.
+        with self._repo.lock():
+            self._ensure_available(user_data)
+            self._repo.put(new_user)
         
         return UserResponse(
             id=user_id,
@@ -112,6 +97,19 @@ class AuthService:
             return None
         return user
     
+    async def authenticate_user_async(self, email: str, password: str) -> Optional[dict]:
+        """authenticate_user with the lookup and bcrypt check off the event loop."""
+        user = await run_storage(self.get_user_by_email, email)
+        if not user:
+            return None
+        if not await run_crypto(self.verify_password, password, user["hashed_password"]):
+            return None
+        return user
+    
+    async def get_user_by_email_async(self, email: str) -> Optional[dict]:
+        """get_user_by_email on the storage pool."""
+        return await run_storage(self.get_user_by_email, email)
+    
     def create_access_token(self, data: dict, expires_delta: Optional[timedelta] = None):
         """Create a JWT access token."""
         to_encode = data.copy()
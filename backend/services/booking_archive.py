@@ -0,0 +1,164 @@
+import gzip
+import hashlib
+import json
+import os
+import re
+import shutil
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional
+
+
+class BookingArchive:
+    """
+    Read-only home for bookings that no longer affect occupancy.
+
+    Two kinds of cold data live here:
+      - bookings.archive.jsonl: cancelled and emptied bookings moved out by
+        compaction, as JSON lines.
+      - bookings.segments/: one gzip-compressed JSON-lines segment per
+        showing that dropped off the schedule (see retire_showings). A
+        segment is written once and never modified; retiring the same
+        showing again adds another segment next to it.
+
+    Both stay part of a user's history through bookings.history/, which
+    holds a copy of every archived booking in one JSON-lines file per user,
+    appended to whenever the archive or a segment is written. Looking up a
+    user's history reads that one file, so it costs in proportion to their
+    own archived bookings, not to everything ever archived.
+
+    Writers (compaction and retirement) hold the booking store's writer
+    lock; readers take no lock.
+    """
+
+    def __init__(self, path: Path, segments_dir: Optional[Path] = None,
+                 history_dir: Optional[Path] = None):
+        self.path = Path(path)
+        self.segments_dir = Path(segments_dir) if segments_dir else self.path.with_name("bookings.segments")
+        self.history_dir = Path(history_dir) if history_dir else self.path.with_name("bookings.history")
+
+    @staticmethod
+    def _append_lines(path: Path, bookings: List[Dict[str, Any]]) -> None:
+        """Append bookings as JSON lines, starting on a fresh line after a torn write."""
+        data = "".join(json.dumps(b, separators=(",", ":"), default=str) + "\n" for b in bookings).encode()
+        with open(path, "a+b") as f:
+            end = f.seek(0, os.SEEK_END)
+            if end:
+                f.seek(end - 1)
+                if f.read(1) != b"\n":
+                    data = b"\n" + data
+            f.write(data)
+
+    def append(self, bookings: List[Dict[str, Any]]) -> None:
+        """Add bookings to the archive."""
+        if not bookings:
+            return
+        self._append_lines(self.path, bookings)
+        self._add_to_history(bookings)
+
+    @staticmethod
+    def _segment_name(movie_id: str, showtime: str) -> str:
+        slug = re.sub(r"[^A-Za-z0-9]+", "-", f"{movie_id}--{showtime}").strip("-")
+        return slug or "showing"
+
+    def write_segment(self, movie_id: str, showtime: str, bookings: List[Dict[str, Any]]) -> Path:
+        """
+        Store every booking of one retired showing as a new compressed segment.
+
+        Returns:
+            Path of the segment file
+        """
+        self.segments_dir.mkdir(parents=True, exist_ok=True)
+        name = self._segment_name(movie_id, showtime)
+        seq = len(list(self.segments_dir.glob(f"{name}.*.jsonl.gz")))
+        path = self.segments_dir / f"{name}.{seq}.jsonl.gz"
+        while path.exists():
+            seq += 1
+            path = self.segments_dir / f"{name}.{seq}.jsonl.gz"
+        # Write under a temporary name so readers never see half a segment.
+        tmp = path.with_suffix(".tmp")
+        with gzip.open(tmp, "wt") as f:
+            for booking in bookings:
+                f.write(json.dumps(booking, separators=(",", ":"), default=str) + "\n")
+        tmp.replace(path)
+        self._add_to_history(bookings)
+        return path
+
+    def _history_path(self, user_id: str, root: Optional[Path] = None) -> Path:
+        """One user's history file (user ids are hashed into file names)."""
+        digest = hashlib.blake2b(str(user_id).encode(), digest_size=10).hexdigest()
+        return (root or self.history_dir) / digest[:2] / f"{digest}.jsonl"
+
+    def _add_to_history(self, bookings: List[Dict[str, Any]], root: Optional[Path] = None) -> None:
+        by_user: Dict[str, List[Dict[str, Any]]] = {}
+        for booking in bookings:
+            by_user.setdefault(booking["user_id"], []).append(booking)
+        for user_id, items in by_user.items():
+            path = self._history_path(user_id, root)
+            path.parent.mkdir(parents=True, exist_ok=True)
+            self._append_lines(path, items)
+
+    def build_history(self) -> None:
+        """
+        Create bookings.history/ from the archive and segments if it is missing.
+
+        Only does work once, for data archived before the per-user files
+        existed. The caller holds the booking store's writer lock.
+        """
+        if self.history_dir.is_dir():
+            return
+        tmp = self.history_dir.with_name(f".{self.history_dir.name}.{os.getpid()}.tmp")
+        shutil.rmtree(tmp, ignore_errors=True)
+        tmp.mkdir(parents=True)
+        self._add_to_history(self.load_all(), root=tmp)
+        try:
+            tmp.replace(self.history_dir)
+        except OSError:
+            # Another process built it first
+            shutil.rmtree(tmp, ignore_errors=True)
+
+    def segments(self) -> List[Path]:
+        """Every segment file, in name order."""
+        if not self.segments_dir.is_dir():
+            return []
+        return sorted(self.segments_dir.glob("*.jsonl.gz"))
+
+    @staticmethod
+    def _read_lines(f) -> Iterator[Dict[str, Any]]:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                yield json.loads(line)
+            except json.JSONDecodeError:
+                # Torn write from a crash; appends resume on the next line
+                continue
+
+    def read_segment(self, path: Path) -> List[Dict[str, Any]]:
+        """Bookings stored in one segment."""
+        with gzip.open(path, "rt") as f:
+            return list(self._read_lines(f))
+
+    def load_all(self) -> List[Dict[str, Any]]:
+        """Every archived booking: compaction archive first, then the segments."""
+        bookings = []
+        try:
+            with open(self.path, "r") as f:
+                bookings.extend(self._read_lines(f))
+        except FileNotFoundError:
+            pass
+        for segment in self.segments():
+            bookings.extend(self.read_segment(segment))
+        return bookings
+
+    def for_user(self, user_id: str) -> List[Dict[str, Any]]:
+        """Archived bookings of one user, oldest archived first."""
+        bookings: Dict[str, Dict[str, Any]] = {}
+        try:
+            with open(self._history_path(user_id), "r") as f:
+                for booking in self._read_lines(f):
+                    # A compaction interrupted after archiving may archive a record twice.
+                    bookings[booking["id"]] = booking
+        except FileNotFoundError:
+            pass
+        return list(bookings.values())
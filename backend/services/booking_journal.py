@@ -0,0 +1,209 @@
+import hashlib
+import json
+import os
+from pathlib import Path
+from typing import Any, ContextManager, Dict, Hashable, List, Optional
+
+from services.repository import JsonRepository, Repository, atomic_write, file_size, file_stamp, fsync_file
+
+
+class BookingJournal(Repository):
+    """
+    Append-only log of booking mutations.
+
+    Each line is one JSON record `{"op": ..., "booking": {...}}` carrying the
+    post-mutation image of a single booking, so a write costs the same no
+    matter how many bookings exist. A batch is a single line with a
+    "bookings" list instead, so a torn write drops the whole batch rather
+    than half of it. State is rebuilt by replaying the log on top of the
+    bookings.json snapshot.
+
+    A crash mid-append leaves a partial last line. It is cut back to the
+    last newline when the journal is opened and before every append (both
+    under lock()), so later records never get glued onto it.
+
+    The first line names the snapshot the journal extends by a digest of
+    its bytes. replace_all() writes the new snapshot, then a fresh journal;
+    if it is interrupted in between, the journal left behind names the old
+    snapshot and every record in it is already in the new one, so it is
+    skipped instead of being replayed (which would bring back bookings the
+    compaction archived) and reset by the next write.
+
+    load_all() takes no lock. BookingService reloads while holding its
+    store lock, and writers take this lock before the store lock, so a
+    locking reader would invert that order. A read that races a
+    compaction can miss records, but the stamp taken before it has moved
+    by then, so the next load reads again.
+    """
+
+    # "put" is a plain upsert for callers that are not booking flows.
+    OPS = ("create", "cancel", "cancel_seats", "put")
+
+    def __init__(self, path: Path, snapshot: JsonRepository):
+        self.path = Path(path)
+        self.snapshot = snapshot
+        # Snapshot stamp whose digest the journal header was last checked against
+        self._checked_stamp: Optional[Hashable] = None
+        if not self.path.exists():
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self.path.touch()
+        with self.lock():
+            with open(self.path, "a+b") as f:
+                self._trim_torn_tail(f)
+            self._ensure_current()
+
+    @staticmethod
+    def _header(snapshot_bytes: bytes) -> bytes:
+        digest = hashlib.blake2b(snapshot_bytes, digest_size=16).hexdigest()
+        return json.dumps({"op": "snapshot", "digest": digest}, separators=(",", ":")).encode() + b"\n"
+
+    def _snapshot_bytes(self) -> bytes:
+        try:
+            return self.snapshot.path.read_bytes()
+        except FileNotFoundError:
+            return b""
+
+    def _ensure_current(self) -> None:
+        """
+        Make the journal's header match the snapshot; the caller holds lock().
+
+        Only re-checked when the snapshot's stamp moved. A journal naming
+        another snapshot was left by an interrupted replace_all() and is
+        reset; one without a header (written before headers existed) gets
+        one for the current snapshot. Change bookings.json only through
+        this class (or with the journal folded in) for that reason.
+        """
+        stamp = self.snapshot.stamp()
+        if stamp == self._checked_stamp:
+            return
+        header = self._header(self._snapshot_bytes())
+        with open(self.path, "rb") as f:
+            first = f.readline()
+            rest = f.read() if first != header else b""
+        if first != header:
+            try:
+                stale = json.loads(first).get("op") == "snapshot"
+            except (ValueError, AttributeError):
+                stale = False
+            if stale:
+                # Kept aside, not deleted: a snapshot edited by hand also lands here
+                os.replace(self.path, self.path.with_name(self.path.name + ".stale"))
+                atomic_write(self.path, header)
+            else:
+                atomic_write(self.path, header + first + rest)
+        self._checked_stamp = stamp
+
+    def append(self, op: str, booking: Dict[str, Any]) -> None:
+        """
+        Append one mutation record.
+
+        Args:
+            op: One of OPS
+            booking: The booking as it looks after the mutation
+        """
+        self._write(op, {"booking": booking})
+
+    def append_batch(self, op: str, bookings: List[Dict[str, Any]]) -> None:
+        """Append one record covering several bookings changed together."""
+        self._write(op, {"bookings": bookings})
+
+    def _write(self, op: str, payload: Dict[str, Any]) -> None:
+        if op not in self.OPS:
+            raise ValueError(f"Unknown journal op: {op}")
+        line = json.dumps({"op": op, **payload}, separators=(",", ":"), default=str)
+        with self.lock():
+            self._ensure_current()
+            with open(self.path, "a+b") as f:
+                self._trim_torn_tail(f)
+                f.write(line.encode() + b"\n")
+
+    @staticmethod
+    def _trim_torn_tail(f) -> None:
+        """Truncate an open journal back to its last newline; the caller holds lock()."""
+        end = f.seek(0, os.SEEK_END)
+        if end == 0:
+            return
+        f.seek(end - 1)
+        if f.read(1) == b"\n":
+            return
+        pos = end
+        while pos > 0:
+            step = min(pos, 1 << 16)
+            f.seek(pos - step)
+            newline = f.read(step).rfind(b"\n")
+            if newline >= 0:
+                pos -= step - newline - 1
+                break
+            pos -= step
+        f.truncate(pos)
+
+    def replay(self, snapshot: List[Dict[str, Any]],
+               header: Optional[bytes] = None) -> List[Dict[str, Any]]:
+        """
+        Rebuild the booking list from a snapshot plus every journal record.
+
+        Args:
+            snapshot: Bookings from the last full snapshot (bookings.json)
+            header: The snapshot's header line; a journal naming another
+                snapshot is stale and contributes nothing
+
+        Returns:
+            List of bookings in creation order
+        """
+        by_id: Dict[str, Dict[str, Any]] = {b["id"]: b for b in snapshot}
+        with open(self.path, "rb") as f:
+            first = f.readline()
+            if header is not None and first != header and first.startswith(b'{"op":"snapshot"'):
+                return snapshot
+            f.seek(0)
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    # A torn write from a crash; records around it are intact.
+                    continue
+                if record.get("op") == "snapshot":
+                    continue
+                for booking in record.get("bookings") or [record["booking"]]:
+                    if booking["id"] in by_id:
+                        by_id[booking["id"]].update(booking)
+                    else:
+                        by_id[booking["id"]] = booking
+        return list(by_id.values())
+
+    def load_all(self) -> List[Dict[str, Any]]:
+        data = self._snapshot_bytes()
+        return self.replay(JsonRepository.records_from(data), self._header(data))
+
+    def put(self, record: Dict[str, Any],
+            records: Optional[List[Dict[str, Any]]] = None, op: str = "put") -> None:
+        self.append(op, record)
+
+    def put_many(self, changed: List[Dict[str, Any]],
+                 records: Optional[List[Dict[str, Any]]] = None, op: str = "put") -> None:
+        self.append_batch(op, changed)
+
+    def replace_all(self, records: List[Dict[str, Any]]) -> None:
+        """Write a fresh snapshot and start an empty journal."""
+        data = self.snapshot.serializer.dumps(records)
+        with self.lock():
+            # Snapshot first: until the journal is swapped, its header marks it stale
+            atomic_write(self.snapshot.path, data)
+            atomic_write(self.path, self._header(data))
+            self._checked_stamp = self.snapshot.stamp()
+
+    def stamp(self) -> Hashable:
+        return (self.snapshot.stamp(), file_stamp(self.path))
+
+    def size_bytes(self) -> int:
+        return self.snapshot.size_bytes() + file_size(self.path)
+
+    def sync(self) -> None:
+        fsync_file(self.path)
+
+    def lock(self) -> ContextManager:
+        # One lock covers the snapshot and the journal.
+        return self.snapshot.lock()
@@ -1,39 +1,391 @@
-import json
+import asyncio
+import functools
+import os
+import threading
+import time
 import uuid
 from datetime import datetime
-from typing import List, Optional, Dict, Any
+from typing import Callable, Hashable, List, Optional, Dict, Any, Set, Tuple
 from pathlib import Path
 
-from models.booking import BookingCreate, BookingResponse
+from models.booking import BookingCreate, BookingResponse, SeatHoldCreate
+from services.booking_archive import BookingArchive
+from services.executors import run_storage
+from services.file_lock import hold_for_process
+from services.group_commit import GroupCommitter
+from services.occupancy_map import SharedOccupancy, shared_occupancy_from_env
+from services.repository import Repository, get_repository
+from services.seat_holds import SeatHoldManager
+from services.seat_map import mask_to_seats, seat_count, seats_to_mask, split_seats
+
+
+def _durable(method):
+    """Return from a mutating method only once its group-committed writes are on disk."""
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        try:
+            return method(self, *args, **kwargs)
+        finally:
+            self._await_writes()
+    return wrapper
 
 
 class BookingService:
-    """Service for managing bookings using JSON file storage."""
+    """
+    Service for managing bookings.
+
+    Storage comes from services/repository.py and is picked with
+    BOOKINGS_STORAGE (falling back to STORAGE_BACKEND):
+      - "json" (default): bookings.json is rewritten on every mutation.
+      - "journal": each mutation appends one record to bookings.journal and
+        state is rebuilt at startup by replaying it over bookings.json.
+      - "sqlite": one row per booking in data/talknbook.db.
+
+    Only current data is kept there. compact() moves cancelled bookings and
+    retire_showings() moves showings that left the schedule into a
+    BookingArchive, which user history still reads.
+
+    Thread safety: the check-and-commit of a booking runs under a lock
+    striped by (movie_id, showtime), so different showings book in parallel
+    while bookings for one showing are strictly serialized. `_store_lock`
+    only guards the shared in-memory state and the repository write, and is
+    always taken after (never before) a showing lock.
+
+    Several worker processes: set OCCUPANCY_FILE and every process maps the
+    same SharedOccupancy file. Availability is then read straight from it,
+    and every store write runs under its file lock (taken after the showing
+    lock, before `_store_lock`) and publishes the new seat masks there, so
+    a worker never books seats another worker just sold.
+
+    Versions: every booking carries a "version" that each mutation bumps.
+    Changes to an existing booking are optimistic: they are computed from
+    a snapshot without any lock and committed only if the stored version
+    is still the one they read (compare-and-swap, see _compare_and_commit);
+    otherwise they are recomputed from the fresh booking, a few times at
+    most. So cancellations take no showing lock and cannot overwrite each
+    other.
+
+    Group commit: with BOOKINGS_GROUP_COMMIT_MS > 0, mutations update memory
+    and queue their write; a writer thread persists everything queued
+    within that window (or BOOKINGS_GROUP_COMMIT_MAX records) with one
+    write + fsync, and the mutating call returns only after that. The
+    batch is written after the writer lock is released, so this needs a
+    single process; a second service on the same data directory (another
+    worker, manage.py) is refused while a group-commit one is running.
+
+    Listeners: callbacks registered with add_listener() get
+    (key, booked mask, held mask) for every showing a booking or hold
+    change touched. They run under `_store_lock`, in commit order, so they
+    must be quick and must not call back into the service.
+    """
     
-    def __init__(self):
-        self.data_dir = Path(__file__).parent.parent / "data"
-        self.bookings_file = self.data_dir / "bookings.json"
-        self._ensure_data_file()
+    LOCK_STRIPES = 64
+    # Attempts at a compare-and-commit before giving up on a busy booking
+    CAS_RETRIES = 5
     
-    def _ensure_data_file(self):
-        """Ensure the bookings data file exists."""
-        if not self.bookings_file.exists():
-            with open(self.bookings_file, 'w') as f:
-                json.dump([], f)
+    def __init__(self, data_dir: Optional[Path] = None, storage: Optional[str] = None,
+                 repository: Optional[Repository] = None,
+                 shared_occupancy: Optional[SharedOccupancy] = None,
+                 group_commit_ms: Optional[float] = None):
+        self.data_dir = Path(data_dir) if data_dir else Path(__file__).parent.parent / "data"
+        self._repo = repository or get_repository("bookings", self.data_dir, storage)
+        # Cancelled/emptied bookings moved out of the live store by compact()
+        self._archive = BookingArchive(self.data_dir / "bookings.archive.jsonl")
+        # In-memory view of the store plus derived indexes. `_stamp` is the
+        # repository's change stamp as of our last load or write; any other
+        # value means someone else changed it.
+        self._bookings: List[Dict[str, Any]] = []
+        # Occupancy is a seat bitmask per showing (see services/seat_map.py).
+        # Legacy records may hold seat IDs that are not on the grid; those
+        # are tracked separately so they still show as booked.
+        self._seat_index: Dict[Tuple[str, str], int] = {}
+        self._offgrid_seats: Dict[Tuple[str, str], Set[str]] = {}
+        # user_id -> that user's bookings in creation order (same dicts as
+        # `_bookings`, so in-place mutations show up without reindexing).
+        self._user_index: Dict[str, List[Dict[str, Any]]] = {}
+        # booking id -> booking (primary key index)
+        self._by_id: Dict[str, Dict[str, Any]] = {}
+        self._stamp: Optional[tuple] = None
+        # Temporary seat holds (in memory only); guarded by _store_lock.
+        self._holds = SeatHoldManager()
+        self._store_lock = threading.RLock()
+        self._showing_locks = [threading.Lock() for _ in range(self.LOCK_STRIPES)]
+        # Occupancy shared with other worker processes (None: this process only)
+        self._shared = shared_occupancy or shared_occupancy_from_env()
+        if self._shared is not None:
+            # The store is the source of truth, and nobody writes while we hold the lock
+            with self._shared.lock():
+                self._reload()
+                self._shared.rebuild(self._seat_index)
+        else:
+            self._reload()
+        with self._writer_lock():
+            self._archive.build_history()
+        
+        if group_commit_ms is None:
+            group_commit_ms = float(os.getenv("BOOKINGS_GROUP_COMMIT_MS", "0"))
+        self._group: Optional[GroupCommitter] = None
+        if group_commit_ms > 0 and self._shared is not None:
+            # Queued writes live only in this process's memory.
+            raise ValueError("Group commit cannot be combined with OCCUPANCY_FILE")
+        # A queued batch is written from this process's memory after the
+        # writer lock is gone, so group commit needs the store to itself:
+        # every service holds this claim shared, group commit exclusively.
+        try:
+            self._claim = hold_for_process(self.data_dir / "bookings.claim.lock", group_commit_ms > 0)
+        except BlockingIOError:
+            if group_commit_ms > 0:
+                raise ValueError("Group commit needs a single process, but another one has "
+                                 "the bookings store open") from None
+            raise ValueError("The bookings store is open in a process running group commit "
+                             "(BOOKINGS_GROUP_COMMIT_MS)") from None
+        if group_commit_ms > 0:
+            self._group = GroupCommitter(self._write_group, group_commit_ms,
+                                         int(os.getenv("BOOKINGS_GROUP_COMMIT_MAX", "256")))
+        # Per-thread writes queued by _commit_many that the caller still has to wait for
+        self._pending = threading.local()
+        self._listeners: List[Callable[[Tuple[str, str], int, int], None]] = []
+    
+    def _reload(self):
+        """Read the store and rebuild every index."""
+        # Stamp before reading: a write that lands in between shows up as a change next time
+        self._stamp = self._repo.stamp()
+        self._bookings = self._repo.load_all()
+        self._seat_index = {}
+        self._offgrid_seats = {}
+        self._user_index = {}
+        self._by_id = {}
+        for booking in self._bookings:
+            self._by_id[booking["id"]] = booking
+            self._index_add(booking, booking["seats"])
+            self._user_index.setdefault(booking["user_id"], []).append(booking)
     
     def _load_bookings(self) -> List[Dict[str, Any]]:
-        """Load bookings from JSON file."""
-        try:
-            with open(self.bookings_file, 'r') as f:
-                return json.load(f)
-        except (FileNotFoundError, json.JSONDecodeError):
-            return []
+        """Return the in-memory bookings, reloading if the store changed outside this process."""
+        with self._store_lock:
+            if self._repo.stamp() != self._stamp:
+                self._reload()
+            return self._bookings
+    
+    def _writer_lock(self):
+        """
+        Cross-process write lock: the shared occupancy file's when configured,
+        else the store's own (see Repository.lock). Held from reading the
+        current state to writing the change, so processes sharing the data
+        files never overwrite each other's bookings.
+        """
+        return self._shared.lock() if self._shared is not None else self._repo.lock()
+    
+    def _publish(self, keys):
+        """Copy the seat masks of `keys` into the shared occupancy file."""
+        if self._shared is None:
+            return
+        for key in keys:
+            occupied = self._seat_index.get(key, 0)
+            while not self._shared.compare_and_set(key, self._shared.get(key), occupied):
+                pass
+    
+    def add_listener(self, listener: Callable[[Tuple[str, str], int, int], None]) -> None:
+        """Call `listener(key, booked, held)` whenever a showing's seats change."""
+        with self._store_lock:
+            self._listeners.append(listener)
+    
+    def _occupancy_of(self, key: Tuple[str, str]) -> Tuple[int, int]:
+        """(booked mask, held-but-not-booked mask) of a showing; caller holds `_store_lock`."""
+        booked = self._shared.get(key) if self._shared is not None else self._seat_index.get(key, 0)
+        return booked, self._holds.held_mask(key) & ~booked
+    
+    def _notify(self, keys):
+        """Tell listeners the current occupancy of `keys`; caller holds `_store_lock`."""
+        if not self._listeners:
+            return
+        for key in keys:
+            booked, held = self._occupancy_of(key)
+            for listener in self._listeners:
+                listener(key, booked, held)
+    
+    def refresh_showings(self, showings: List[Tuple[str, str]]):
+        """
+        Re-read the store and notify listeners about `showings`.
+        
+        Picks up what no commit here announces: holds that lapsed and
+        bookings made by other worker processes.
+        """
+        with self._store_lock:
+            self._load_bookings()
+            self._notify([self._showing_key(movie_id, showtime) for movie_id, showtime in showings])
+    
+    @staticmethod
+    def _showing_key(movie_id: str, showtime: str) -> Tuple[str, str]:
+        return (movie_id, showtime)
+    
+    def _showing_lock(self, movie_id: str, showtime: str) -> threading.Lock:
+        """The lock stripe guarding check-and-commit for one showing."""
+        key = self._showing_key(movie_id, showtime)
+        return self._showing_locks[hash(key) % self.LOCK_STRIPES]
     
-    def _save_bookings(self, bookings: List[Dict[str, Any]]):
-        """Save bookings to JSON file."""
-        with open(self.bookings_file, 'w') as f:
-            json.dump(bookings, f, indent=2, default=str)
+    def _index_add(self, booking: Dict[str, Any], seats: List[str]):
+        """Mark `seats` of a confirmed booking as occupied."""
+        if booking["status"] != "confirmed":
+            return
+        key = self._showing_key(booking["movie_id"], booking["showtime"])
+        mask, offgrid = split_seats(seats)
+        self._seat_index[key] = self._seat_index.get(key, 0) | mask
+        if offgrid:
+            self._offgrid_seats.setdefault(key, set()).update(offgrid)
     
+    def _index_remove(self, booking: Dict[str, Any], seats: List[str]):
+        """Release `seats` of a confirmed booking from the occupancy index."""
+        if booking["status"] != "confirmed":
+            return
+        key = self._showing_key(booking["movie_id"], booking["showtime"])
+        mask, offgrid = split_seats(seats)
+        occupied = self._seat_index.get(key, 0) & ~mask
+        if occupied:
+            self._seat_index[key] = occupied
+        else:
+            self._seat_index.pop(key, None)
+        if offgrid and key in self._offgrid_seats:
+            self._offgrid_seats[key].difference_update(offgrid)
+            if not self._offgrid_seats[key]:
+                del self._offgrid_seats[key]
+    
+    def _commit(self, op: str, booking: Dict[str, Any], bookings: List[Dict[str, Any]]):
+        """
+        Persist one mutation.
+        
+        Args:
+            op: "create", "cancel" or "cancel_seats"
+            booking: The booking that changed (already mutated in `bookings`)
+            bookings: The full booking list it belongs to
+        """
+        self._commit_many(op, [booking], bookings)
+    
+    def _commit_many(self, op: str, changed: List[Dict[str, Any]], bookings: List[Dict[str, Any]]):
+        """
+        Persist several mutations in one repository write.
+        
+        If the write fails the in-memory state is reloaded from the store,
+        so callers never see changes that were not persisted.
+        """
+        with self._store_lock:
+            if self._group is not None:
+                # Written by _write_group; the @_durable caller waits for it.
+                self._pending.acks = getattr(self._pending, "acks", [])
+                self._pending.acks.append(self._group.submit((op, changed)))
+                self._notify({self._showing_key(b["movie_id"], b["showtime"]) for b in changed})
+                return
+            try:
+                if len(changed) == 1:
+                    self._repo.put(changed[0], bookings, op=op)
+                else:
+                    self._repo.put_many(changed, bookings, op=op)
+            except Exception:
+                self._reload()
+                raise
+            self._stamp = self._repo.stamp()
+            keys = {self._showing_key(b["movie_id"], b["showtime"]) for b in changed}
+            self._publish(keys)
+            self._notify(keys)
+    
+    def _snapshot(self, booking_id: str) -> Optional[Dict[str, Any]]:
+        """A private copy of a booking to compute a change from, or None."""
+        with self._store_lock:
+            self._load_bookings()
+            booking = self._by_id.get(booking_id)
+            if booking is None:
+                return None
+            return dict(booking, seats=list(booking["seats"]))
+    
+    def _compare_and_commit(self, op: str, updated: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """
+        Store `updated` if the booking is still at the version it was read at.
+        
+        Args:
+            op: "cancel" or "cancel_seats"
+            updated: A _snapshot() with the change applied; its "version"
+                is the version the change was computed from
+        
+        Returns:
+            The live booking, now at the next version, or None if it has
+            changed or gone since (the caller should recompute and retry)
+        """
+        with self._writer_lock(), self._store_lock:
+            self._load_bookings()
+            current = self._by_id.get(updated["id"])
+            expected = updated.get("version", 0)
+            if current is None or current.get("version", 0) != expected:
+                return None
+            self._index_remove(current, current["seats"])
+            self._index_add(updated, updated["seats"])
+            # Update in place: every index already points at this dict
+            current.update(updated, version=expected + 1)
+            self._commit(op, current, self._bookings)
+            return current
+    
+    def _write_group(self, items: List[Tuple[str, List[Dict[str, Any]]]]):
+        """
+        Persist a batch of queued mutations with one write and one fsync.
+        
+        Runs on the group-commit thread. On failure, everything still queued
+        is failed too and memory is reloaded from the store. Writes the
+        whole in-memory list, so group commit assumes this is the only
+        process writing bookings.
+        """
+        with self._repo.lock(), self._store_lock:
+            changed: Dict[str, Dict[str, Any]] = {}
+            for _, bookings in items:
+                for booking in bookings:
+                    # Skip records a compaction or reload replaced since; they are already stored.
+                    if self._by_id.get(booking["id"]) is booking:
+                        changed[booking["id"]] = booking
+            ops = {op for op, _ in items}
+            op = ops.pop() if len(ops) == 1 else "put"
+            try:
+                if len(changed) == 1:
+                    self._repo.put(next(iter(changed.values())), self._bookings, op=op)
+                elif changed:
+                    self._repo.put_many(list(changed.values()), self._bookings, op=op)
+                self._repo.sync()
+            except Exception as exc:
+                self._group.fail_queued(exc)
+                self._reload()
+                raise
+            self._stamp = self._repo.stamp()
+    
+    def _take_acks(self) -> list:
+        """This thread's queued-write futures, clearing the list."""
+        acks = getattr(self._pending, "acks", None) or []
+        self._pending.acks = []
+        return acks
+    
+    def _await_writes(self):
+        """Wait for this thread's queued writes; raises if one failed."""
+        for ack in self._take_acks():
+            ack.result()
+    
+    async def _run_durable(self, method, *args):
+        """
+        Run a @_durable method on the storage pool but wait for its group
+        commit on the event loop, so pool threads are not parked for the
+        commit window.
+        """
+        def call():
+            try:
+                return method.__wrapped__(self, *args), self._take_acks()
+            except BaseException:
+                self._take_acks()
+                raise
+        result, acks = await run_storage(call)
+        for ack in acks:
+            await asyncio.wrap_future(ack)
+        return result
+    
+    def commit_stats(self) -> Optional[Dict[str, Any]]:
+        """Group-commit batch statistics, or None when group commit is off."""
+        return self._group.stats() if self._group is not None else None
+    
+    @_durable
     def create_booking(self, booking_data: BookingCreate, user_id: str) -> Dict[str, Any]:
         """
         Create a new booking.
@@ -45,14 +397,25 @@ class BookingService:
         Returns:
             Dict containing the created booking
         """
-        bookings = self._load_bookings()
+        with self._showing_lock(booking_data.movie_id, booking_data.showtime), self._writer_lock():
+            return self._create_locked(booking_data, user_id)
+    
+    def _create_locked(self, booking_data: BookingCreate, user_id: str) -> Dict[str, Any]:
+        """create_booking body; the caller holds the showing lock and the writer lock."""
+        requested = seats_to_mask(booking_data.seats)
+        key = self._showing_key(booking_data.movie_id, booking_data.showtime)
         
         # Check if seats are already booked for this movie/showtime
-        booked_seats = self.get_booked_seats(booking_data.movie_id, booking_data.showtime)
-        conflicting_seats = set(booking_data.seats) & set(booked_seats)
+        conflicting = requested & self.get_occupancy_mask(booking_data.movie_id, booking_data.showtime)
         
-        if conflicting_seats:
-            raise ValueError(f"Seats {list(conflicting_seats)} are already booked")
+        if conflicting:
+            raise ValueError(f"Seats {mask_to_seats(conflicting)} are already booked")
+        
+        # Seats the user holds themselves are theirs to book
+        with self._store_lock:
+            held = requested & self._holds.held_mask(key, exclude_user=user_id)
+        if held:
+            raise ValueError(f"Seats {mask_to_seats(held)} are currently held by another customer")
         
         booking = {
             "id": str(uuid.uuid4()),
@@ -63,14 +426,236 @@ class BookingService:
             "seats": booking_data.seats,
             "total_price": booking_data.total_price,
             "booking_date": datetime.now().isoformat(),
-            "status": "confirmed"
+            "status": "confirmed",
+            "version": 1
         }
         
-        bookings.append(booking)
-        self._save_bookings(bookings)
+        with self._store_lock:
+            bookings = self._load_bookings()
+            bookings.append(booking)
+            self._index_add(booking, booking["seats"])
+            self._user_index.setdefault(user_id, []).append(booking)
+            self._by_id[booking["id"]] = booking
+            self._commit("create", booking, bookings)
+            self._holds.release_seats(key, user_id, requested)
+            self._notify([key])
         
         return booking
     
+    @_durable
+    def create_bookings(self, items: List[BookingCreate], user_id: str) -> List[Dict[str, Any]]:
+        """
+        Create several bookings atomically: either all succeed or none do.
+        
+        All items are checked against current occupancy (and each other)
+        before anything is written, then committed in a single write.
+        
+        Args:
+            items: The bookings to create, possibly for different showings
+            user_id: ID of the user making the bookings
+            
+        Returns:
+            List of created bookings, in the order given
+        """
+        if not items:
+            raise ValueError("No bookings given")
+        
+        requested: Dict[Tuple[str, str], int] = {}
+        for item in items:
+            key = self._showing_key(item.movie_id, item.showtime)
+            mask = seats_to_mask(item.seats)
+            overlap = requested.get(key, 0) & mask
+            if overlap:
+                raise ValueError(f"Seats {mask_to_seats(overlap)} appear twice for {item.movie_title} at {item.showtime}")
+            requested[key] = requested.get(key, 0) | mask
+        
+        # Take every showing's stripe once, in a fixed order, so two batches
+        # can never deadlock on each other.
+        stripes = sorted({hash(key) % self.LOCK_STRIPES for key in requested})
+        locks = [self._showing_locks[i] for i in stripes]
+        for lock in locks:
+            lock.acquire()
+        try:
+            with self._writer_lock(), self._store_lock:
+                self._load_bookings()
+                for (movie_id, showtime), mask in requested.items():
+                    conflicting = mask & self._seat_index.get((movie_id, showtime), 0)
+                    if conflicting:
+                        raise ValueError(f"Seats {mask_to_seats(conflicting)} are already booked for {movie_id} at {showtime}")
+                    held = mask & self._holds.held_mask((movie_id, showtime), exclude_user=user_id)
+                    if held:
+                        raise ValueError(f"Seats {mask_to_seats(held)} are currently held by another customer")
+                
+                booking_date = datetime.now().isoformat()
+                created = [
+                    {
+                        "id": str(uuid.uuid4()),
+                        "user_id": user_id,
+                        "movie_id": item.movie_id,
+                        "movie_title": item.movie_title,
+                        "showtime": item.showtime,
+                        "seats": item.seats,
+                        "total_price": item.total_price,
+                        "booking_date": booking_date,
+                        "status": "confirmed",
+                        "version": 1
+                    }
+                    for item in items
+                ]
+                
+                bookings = self._bookings
+                for booking in created:
+                    bookings.append(booking)
+                    self._index_add(booking, booking["seats"])
+                    self._user_index.setdefault(user_id, []).append(booking)
+                    self._by_id[booking["id"]] = booking
+                self._commit_many("create", created, bookings)
+                for key, mask in requested.items():
+                    self._holds.release_seats(key, user_id, mask)
+                self._notify(requested)
+        finally:
+            for lock in reversed(locks):
+                lock.release()
+        
+        return created
+    
+    def hold_seats(self, hold_data: SeatHoldCreate, user_id: str) -> Dict[str, Any]:
+        """
+        Reserve seats for a short time so checkout cannot lose them.
+        
+        Args:
+            hold_data: The seats to hold plus the booking details to confirm later
+            user_id: ID of the user holding the seats
+            
+        Returns:
+            Dict describing the hold
+        """
+        requested = seats_to_mask(hold_data.seats)
+        key = self._showing_key(hold_data.movie_id, hold_data.showtime)
+        
+        with self._showing_lock(hold_data.movie_id, hold_data.showtime):
+            occupied = self.get_occupancy_mask(hold_data.movie_id, hold_data.showtime)
+            with self._store_lock:
+                hold = self._holds.place(
+                    key, requested, user_id, occupied, hold_data.ttl_seconds,
+                    # Per-seat price, since the hold can shrink before it is confirmed
+                    details={"movie_title": hold_data.movie_title,
+                             "seat_price": hold_data.total_price / max(len(set(hold_data.seats)), 1)},
+                )
+                self._notify([key])
+                return self._hold_view(hold)
+    
+    @_durable
+    def confirm_hold(self, hold_id: str, user_id: str) -> Dict[str, Any]:
+        """
+        Turn a live hold into a confirmed booking.
+        
+        Args:
+            hold_id: ID of the hold
+            user_id: ID of the user (must own the hold)
+            
+        Returns:
+            Dict containing the created booking
+        """
+        hold = self._get_own_hold(hold_id, user_id)
+        movie_id, showtime = hold["key"]
+        
+        with self._showing_lock(movie_id, showtime), self._writer_lock():
+            # Re-check under the lock: the hold may have lapsed meanwhile
+            hold = self._get_own_hold(hold_id, user_id)
+            return self._create_locked(
+                BookingCreate(
+                    movie_id=movie_id,
+                    movie_title=hold["movie_title"],
+                    showtime=showtime,
+                    seats=mask_to_seats(hold["mask"]),
+                    total_price=self._hold_price(hold),
+                ),
+                user_id,
+            )
+    
+    def release_hold(self, hold_id: str, user_id: str) -> bool:
+        """
+        Give up a hold before it expires.
+        
+        Returns:
+            True if a live hold owned by the user was released, False otherwise
+        """
+        with self._store_lock:
+            hold = self._holds.get(hold_id)
+            if hold is None or hold["user_id"] != user_id:
+                return False
+            self._holds.release(hold_id)
+            self._notify([hold["key"]])
+            return True
+    
+    def release_held_seats(self, movie_id: str, showtime: str, seats: List[str], user_id: str) -> List[str]:
+        """
+        Take seats out of the user's holds on a showing (unselecting them).
+        
+        Seats the user does not hold are ignored.
+        
+        Returns:
+            The seats the user still holds on the showing
+        """
+        key = self._showing_key(movie_id, showtime)
+        mask, _ = split_seats(seats)
+        with self._store_lock:
+            self._holds.release_seats(key, user_id, mask)
+            self._notify([key])
+            return self.get_user_held_seats(movie_id, showtime, user_id)
+    
+    def renew_held_seats(self, movie_id: str, showtime: str, seats: List[str], user_id: str) -> List[str]:
+        """
+        Keep the user's holds on these seats alive for another full TTL.
+        
+        Returns:
+            The seats (of `seats`) the user still holds; any others lapsed
+        """
+        key = self._showing_key(movie_id, showtime)
+        mask, _ = split_seats(seats)
+        with self._store_lock:
+            return mask_to_seats(self._holds.extend(key, user_id, mask))
+    
+    def get_user_held_seats(self, movie_id: str, showtime: str, user_id: str) -> List[str]:
+        """Seats one user currently holds on a showing."""
+        key = self._showing_key(movie_id, showtime)
+        with self._store_lock:
+            held = self._holds.held_mask(key)
+            return mask_to_seats(held & ~self._holds.held_mask(key, exclude_user=user_id))
+    
+    def get_held_seats(self, movie_id: str, showtime: str) -> List[str]:
+        """Seats currently held (not yet booked) for a movie and showtime."""
+        return mask_to_seats(self.get_held_mask(movie_id, showtime))
+    
+    def get_held_mask(self, movie_id: str, showtime: str) -> int:
+        """Held seats for a showing as a bitmask."""
+        with self._store_lock:
+            return self._holds.held_mask(self._showing_key(movie_id, showtime))
+    
+    def _get_own_hold(self, hold_id: str, user_id: str) -> Dict[str, Any]:
+        with self._store_lock:
+            hold = self._holds.get(hold_id)
+        if hold is None or hold["user_id"] != user_id:
+            raise ValueError("Hold not found or expired")
+        return hold
+    
+    @staticmethod
+    def _hold_price(hold: Dict[str, Any]) -> float:
+        return round(hold["seat_price"] * seat_count(hold["mask"]), 2)
+    
+    def _hold_view(self, hold: Dict[str, Any]) -> Dict[str, Any]:
+        movie_id, showtime = hold["key"]
+        return {
+            "id": hold["id"],
+            "movie_id": movie_id,
+            "movie_title": hold["movie_title"],
+            "showtime": showtime,
+            "seats": mask_to_seats(hold["mask"]),
+            "total_price": self._hold_price(hold),
+            "expires_in": round(self._holds.seconds_left(hold), 1),
+        }
+    
     def get_user_bookings(self, user_id: str) -> List[Dict[str, Any]]:
         """
         Get all bookings for a specific user.
@@ -81,8 +666,17 @@ class BookingService:
         Returns:
             List of user's bookings
         """
-        bookings = self._load_bookings()
-        return [booking for booking in bookings if booking["user_id"] == user_id]
+        # Read the archive outside the store lock: it is disk I/O and never
+        # changes what the live store holds.
+        archived = self._archive.for_user(user_id)
+        with self._store_lock:
+            self._load_bookings()
+            bookings = list(self._user_index.get(user_id, ()))
+            # A compaction interrupted before rewriting the store leaves records in both
+            archived = [b for b in archived if b["id"] not in self._by_id]
+        if archived:
+            bookings = sorted(archived + bookings, key=lambda b: str(b["booking_date"]))
+        return bookings
     
     def get_booked_seats(self, movie_id: str, showtime: str) -> List[str]:
         """
@@ -95,16 +689,173 @@ class BookingService:
         Returns:
             List of booked seat IDs
         """
-        bookings = self._load_bookings()
-        booked_seats = []
+        key = self._showing_key(movie_id, showtime)
+        with self._store_lock:
+            booked_seats = mask_to_seats(self.get_occupancy_mask(movie_id, showtime))
+            booked_seats.extend(sorted(self._offgrid_seats.get(key, ())))
+        return booked_seats
+    
+    def get_occupancy_version(self, movie_id: str, showtime: str) -> Hashable:
+        """
+        A value that changes whenever a showing's booked or held seats do.
+        
+        The masks themselves serve as the version: they are already in
+        memory (or in the shared occupancy file), so this costs no seat
+        lists, and unlike a change counter they also move when holds lapse
+        or another worker books.
+        """
+        key = self._showing_key(movie_id, showtime)
+        with self._store_lock:
+            booked = self.get_occupancy_mask(movie_id, showtime)
+            offgrid = tuple(sorted(self._offgrid_seats.get(key, ())))
+            return (booked, offgrid, self._holds.held_mask(key))
+    
+    def get_occupancy_mask(self, movie_id: str, showtime: str) -> int:
+        """
+        Get the booked seats for a showing as a bitmask.
         
-        for booking in bookings:
-            if (booking["movie_id"] == movie_id and 
-                booking["showtime"] == showtime and 
-                booking["status"] == "confirmed"):
-                booked_seats.extend(booking["seats"])
+        Args:
+            movie_id: ID of the movie
+            showtime: The showtime
+            
+        Returns:
+            Seat bitmask (see services/seat_map.py)
+        """
+        key = self._showing_key(movie_id, showtime)
+        if self._shared is not None:
+            return self._shared.get(key)
+        with self._store_lock:
+            self._load_bookings()
+            return self._seat_index.get(key, 0)
+    
+    @staticmethod
+    def _is_live(booking: Dict[str, Any]) -> bool:
+        """Whether a booking still holds seats."""
+        return booking["status"] == "confirmed" and bool(booking["seats"])
+    
+    def _time_load(self) -> float:
+        """Milliseconds for a full load of the store."""
+        start = time.perf_counter()
+        self._repo.load_all()
+        return (time.perf_counter() - start) * 1000
+    
+    def compact(self, archive: bool = True) -> Dict[str, Any]:
+        """
+        Rewrite the store as a snapshot of live bookings only.
         
-        return booked_seats
+        Cancelled bookings and bookings left with no seats are moved to
+        bookings.archive.jsonl (still shown in the owner's history) or, with
+        archive=False, dropped. In journal mode this also folds the journal
+        into a fresh bookings.json.
+        
+        Args:
+            archive: Keep dead bookings in the archive instead of deleting them
+            
+        Returns:
+            Report with record counts, bytes reclaimed and load times
+        """
+        with self._writer_lock(), self._store_lock:
+            bookings = self._load_bookings()
+            bytes_before = self._repo.size_bytes()
+            load_ms_before = self._time_load()
+            
+            live = [b for b in bookings if self._is_live(b)]
+            dead = [b for b in bookings if not self._is_live(b)]
+            if archive:
+                # Archive first: a crash in between leaves a duplicate, not a loss
+                self._archive.append(dead)
+            self._repo.replace_all(live)
+            self._repo.vacuum()
+            
+            bytes_after = self._repo.size_bytes()
+            load_ms_after = self._time_load()
+            self._reload()
+        
+        return {
+            "live": len(live),
+            "archived" if archive else "dropped": len(dead),
+            "bytes_before": bytes_before,
+            "bytes_after": bytes_after,
+            "bytes_reclaimed": bytes_before - bytes_after,
+            "load_ms_before": round(load_ms_before, 3),
+            "load_ms_after": round(load_ms_after, 3),
+        }
+    
+    def retire_showings(self, active: Set[Tuple[str, str]]) -> Dict[str, Any]:
+        """
+        Move bookings of showings that are no longer scheduled to cold storage.
+        
+        Bookings are partitioned by showing: every showing not in `active`
+        is written out as a compressed, read-only segment (see
+        BookingArchive) and dropped from the live store, so loading and
+        indexing only cover the current schedule. Retired bookings still
+        appear in the owner's history.
+        
+        Args:
+            active: (movie_id, showtime) pairs on the current schedule
+            
+        Returns:
+            Report with the number of live and retired bookings and the
+            segments written
+        
+        Raises:
+            ValueError: If `active` is empty (that would retire everything)
+        """
+        if not active:
+            raise ValueError("No active showings given; refusing to retire every booking")
+        with self._writer_lock(), self._store_lock:
+            bookings = self._load_bookings()
+            keep = []
+            retired: Dict[Tuple[str, str], List[Dict[str, Any]]] = {}
+            for booking in bookings:
+                key = self._showing_key(booking["movie_id"], booking["showtime"])
+                if key in active:
+                    keep.append(booking)
+                else:
+                    retired.setdefault(key, []).append(booking)
+            
+            segments = []
+            if retired:
+                # Segments first: a crash in between leaves a duplicate, not a loss
+                for (movie_id, showtime), items in retired.items():
+                    segments.append(self._archive.write_segment(movie_id, showtime, items).name)
+                self._repo.replace_all(keep)
+                self._reload()
+                self._publish(retired)
+                self._notify(retired)
+        
+        return {
+            "live": len(keep),
+            "retired": sum(len(items) for items in retired.values()),
+            "segments": segments,
+        }
+    
+    def get_booked_showings(self) -> Set[Tuple[str, str]]:
+        """
+        Every showing with at least one booking in the live store.
+        
+        Returns:
+            Set of (movie_id, showtime) pairs
+        """
+        with self._store_lock:
+            return {self._showing_key(b["movie_id"], b["showtime"]) for b in self._load_bookings()}
+    
+    def get_occupancy(self, showings: List[Tuple[str, str]]) -> Dict[Tuple[str, str], Tuple[int, int]]:
+        """
+        Booked and held seats for many showings in one pass.
+        
+        Args:
+            showings: (movie_id, showtime) pairs
+            
+        Returns:
+            Dict of (movie_id, showtime) -> (booked mask, held mask)
+        """
+        with self._store_lock:
+            self._load_bookings()
+            return {
+                self._showing_key(movie_id, showtime): self._occupancy_of(self._showing_key(movie_id, showtime))
+                for movie_id, showtime in showings
+            }
     
     def get_booking_by_id(self, booking_id: str) -> Optional[Dict[str, Any]]:
         """
@@ -116,12 +867,11 @@ class BookingService:
         Returns:
             Booking dict if found, None otherwise
         """
-        bookings = self._load_bookings()
-        for booking in bookings:
-            if booking["id"] == booking_id:
-                return booking
-        return None
+        with self._store_lock:
+            self._load_bookings()
+            return self._by_id.get(booking_id)
     
+    @_durable
     def cancel_booking(self, booking_id: str, user_id: str) -> bool:
         """
         Cancel a booking.
@@ -132,17 +882,22 @@ class BookingService:
             
         Returns:
             True if cancelled successfully, False otherwise
-        """
-        bookings = self._load_bookings()
         
-        for booking in bookings:
-            if booking["id"] == booking_id and booking["user_id"] == user_id:
-                booking["status"] = "cancelled"
-                self._save_bookings(bookings)
+        Raises:
+            ValueError: If the booking kept changing under us (see CAS_RETRIES)
+        """
+        for _ in range(self.CAS_RETRIES):
+            booking = self._snapshot(booking_id)
+            
+            if booking is None or booking["user_id"] != user_id:
+                return False
+            
+            booking["status"] = "cancelled"
+            if self._compare_and_commit("cancel", booking):
                 return True
-        
-        return False
+        raise ValueError("Booking was modified concurrently, please try again")
     
+    @_durable
     def cancel_seats(self, booking_id: str, seats_to_cancel: List[str], user_id: str) -> Dict[str, Any]:
         """
         Cancel specific seats from a booking.
@@ -154,48 +909,109 @@ class BookingService:
             
         Returns:
             Dict containing the updated booking info and operation result
-        """
-        bookings = self._load_bookings()
         
-        for booking in bookings:
-            if booking["id"] == booking_id and booking["user_id"] == user_id:
-                if booking["status"] != "confirmed":
-                    return {"success": False, "message": "Can only cancel seats from confirmed bookings"}
-                
-                # Check if all seats to cancel exist in the booking
-                current_seats = set(booking["seats"])
-                seats_to_cancel_set = set(seats_to_cancel)
-                
-                if not seats_to_cancel_set.issubset(current_seats):
-                    invalid_seats = seats_to_cancel_set - current_seats
-                    return {"success": False, "message": f"Seats {list(invalid_seats)} are not in this booking"}
-                
-                # Remove the seats
-                remaining_seats = list(current_seats - seats_to_cancel_set)
+        Raises:
+            ValueError: If the booking kept changing under us (see CAS_RETRIES)
+        """
+        for _ in range(self.CAS_RETRIES):
+            booking = self._snapshot(booking_id)
+            
+            if booking is None or booking["user_id"] != user_id:
+                return {"success": False, "message": "Booking not found or access denied"}
+            
+            if booking["status"] != "confirmed":
+                return {"success": False, "message": "Can only cancel seats from confirmed bookings"}
+            
+            # Check if all seats to cancel exist in the booking
+            current_seats = set(booking["seats"])
+            seats_to_cancel_set = set(seats_to_cancel)
+            
+            if not seats_to_cancel_set.issubset(current_seats):
+                invalid_seats = seats_to_cancel_set - current_seats
+                return {"success": False, "message": f"Seats {list(invalid_seats)} are not in this booking"}
+            
+            # Remove the seats
+            remaining_seats = list(current_seats - seats_to_cancel_set)
+            
+            if not remaining_seats:
+                # If no seats remain, cancel the entire booking
+                booking["status"] = "cancelled"
+                booking["seats"] = []
+                booking["total_price"] = 0.0
+                message = "All seats cancelled, booking status changed to cancelled"
+            else:
+                # Update the booking with remaining seats and recalculate price
+                seat_price = booking["total_price"] / len(booking["seats"])  # Calculate price per seat
+                new_total_price = seat_price * len(remaining_seats)
                 
-                if not remaining_seats:
-                    # If no seats remain, cancel the entire booking
-                    booking["status"] = "cancelled"
-                    booking["seats"] = []
-                    booking["total_price"] = 0.0
-                    self._save_bookings(bookings)
-                    return {
-                        "success": True, 
-                        "message": "All seats cancelled, booking status changed to cancelled",
-                        "booking": booking
-                    }
-                else:
-                    # Update the booking with remaining seats and recalculate price
-                    seat_price = booking["total_price"] / len(booking["seats"])  # Calculate price per seat
-                    new_total_price = seat_price * len(remaining_seats)
-                    
-                    booking["seats"] = remaining_seats
-                    booking["total_price"] = round(new_total_price, 2)
-                    self._save_bookings(bookings)
-                    return {
-                        "success": True,
-                        "message": f"Successfully cancelled {len(seats_to_cancel)} seat(s)",
-                        "booking": booking
-                    }
-        
-        return {"success": False, "message": "Booking not found or access denied"}
\ No newline at end of file
+                booking["seats"] = remaining_seats
+                booking["total_price"] = round(new_total_price, 2)
+                message = f"Successfully cancelled {len(seats_to_cancel)} seat(s)"
+            
+            committed = self._compare_and_commit("cancel_seats", booking)
+            if committed is not None:
+                return {"success": True, "message": message, "booking": committed}
+        raise ValueError("Booking was modified concurrently, please try again")
+    
+    # Async entry points for route handlers: the same operations, run on the
+    # storage pool (services/executors.py) so lock waits and disk writes
+    # never block the event loop. Group-commit acks are awaited on the loop.
+    
+    async def create_booking_async(self, booking_data: BookingCreate, user_id: str) -> Dict[str, Any]:
+        return await self._run_durable(BookingService.create_booking, booking_data, user_id)
+    
+    async def create_bookings_async(self, items: List[BookingCreate], user_id: str) -> List[Dict[str, Any]]:
+        return await self._run_durable(BookingService.create_bookings, items, user_id)
+    
+    async def hold_seats_async(self, hold_data: SeatHoldCreate, user_id: str) -> Dict[str, Any]:
+        return await run_storage(self.hold_seats, hold_data, user_id)
+    
+    async def release_held_seats_async(self, movie_id: str, showtime: str, seats: List[str], user_id: str) -> List[str]:
+        return await run_storage(self.release_held_seats, movie_id, showtime, seats, user_id)
+    
+    async def renew_held_seats_async(self, movie_id: str, showtime: str, seats: List[str], user_id: str) -> List[str]:
+        return await run_storage(self.renew_held_seats, movie_id, showtime, seats, user_id)
+    
+    async def get_user_held_seats_async(self, movie_id: str, showtime: str, user_id: str) -> List[str]:
+        return await run_storage(self.get_user_held_seats, movie_id, showtime, user_id)
+    
+    async def release_hold_async(self, hold_id: str, user_id: str) -> bool:
+        return await run_storage(self.release_hold, hold_id, user_id)
+    
+    async def get_held_seats_async(self, movie_id: str, showtime: str) -> List[str]:
+        return await run_storage(self.get_held_seats, movie_id, showtime)
+    
+    async def confirm_hold_async(self, hold_id: str, user_id: str) -> Dict[str, Any]:
+        return await self._run_durable(BookingService.confirm_hold, hold_id, user_id)
+    
+    async def get_user_bookings_async(self, user_id: str) -> List[Dict[str, Any]]:
+        return await run_storage(self.get_user_bookings, user_id)
+    
+    async def get_booked_seats_async(self, movie_id: str, showtime: str) -> List[str]:
+        return await run_storage(self.get_booked_seats, movie_id, showtime)
+    
+    async def get_occupancy_version_async(self, movie_id: str, showtime: str) -> Hashable:
+        return await run_storage(self.get_occupancy_version, movie_id, showtime)
+    
+    async def get_occupancy_async(self, showings: List[Tuple[str, str]]) -> Dict[Tuple[str, str], Tuple[int, int]]:
+        return await run_storage(self.get_occupancy, showings)
+    
+    async def get_booking_by_id_async(self, booking_id: str) -> Optional[Dict[str, Any]]:
+        return await run_storage(self.get_booking_by_id, booking_id)
+    
+    async def cancel_booking_async(self, booking_id: str, user_id: str) -> bool:
+        return await self._run_durable(BookingService.cancel_booking, booking_id, user_id)
+    
+    async def cancel_seats_async(self, booking_id: str, seats_to_cancel: List[str], user_id: str) -> Dict[str, Any]:
+        return await self._run_durable(BookingService.cancel_seats, booking_id, seats_to_cancel, user_id)
+
+
+_booking_service: Optional[BookingService] = None
+
+
+def get_booking_service() -> BookingService:
+    """Process-wide BookingService shared by the HTTP routes and voice tools."""
+    global _booking_service
+    if _booking_service is None:
+        _booking_service = BookingService()
+    return _booking_service
@@ -0,0 +1,74 @@
+"""
+Bounded thread pools for blocking work called from async code.
+
+Route handlers are `async def`, so a synchronous file write or bcrypt hash
+inside one stalls every other request on the event loop. Services expose
+`*_async` entry points that hand such work to one of two pools:
+
+  - storage (STORAGE_THREADS, default 4): repository reads and writes
+  - crypto (CRYPTO_THREADS, default 2): bcrypt hashing and checking
+
+Separate pools keep a burst of logins from queueing ahead of bookings and
+vice versa. A size of 0 runs the work inline on the event loop (the old
+behaviour, useful for benchmarking).
+"""
+
+import asyncio
+import functools
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional, TypeVar
+
+
+T = TypeVar("T")
+
+POOL_SIZES = {
+    "storage": ("STORAGE_THREADS", 4),
+    "crypto": ("CRYPTO_THREADS", 2),
+}
+
+_pools: Dict[str, Optional[ThreadPoolExecutor]] = {}
+_pools_lock = threading.Lock()
+
+
+def pool_size(name: str) -> int:
+    """Configured size of a pool (0 = run inline)."""
+    env, default = POOL_SIZES[name]
+    return max(0, int(os.getenv(env, default)))
+
+
+def _get_pool(name: str) -> Optional[ThreadPoolExecutor]:
+    with _pools_lock:
+        if name not in _pools:
+            size = pool_size(name)
+            _pools[name] = ThreadPoolExecutor(size, thread_name_prefix=name) if size else None
+        return _pools[name]
+
+
+async def _run(name: str, func: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+    pool = _get_pool(name)
+    if pool is None:
+        return func(*args, **kwargs)
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(pool, functools.partial(func, *args, **kwargs))
+
+
+async def run_storage(func: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+    """Run a blocking storage call on the storage pool."""
+    return await _run("storage", func, *args, **kwargs)
+
+
+async def run_crypto(func: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+    """Run a CPU-heavy crypto call (bcrypt) on the crypto pool."""
+    return await _run("crypto", func, *args, **kwargs)
+
+
+def shutdown_executors() -> None:
+    """Stop the pools (they are recreated on next use)."""
+    with _pools_lock:
+        pools = list(_pools.values())
+        _pools.clear()
+    for pool in pools:
+        if pool is not None:
+            pool.shutdown(wait=True)
@@ -0,0 +1,80 @@
+import os
+import threading
+from pathlib import Path
+from typing import Dict, Optional
+
+try:
+    import fcntl
+except ImportError:  # Windows: threads are still excluded, other processes are not
+    fcntl = None
+
+
+class FileLock:
+    """
+    Exclusive advisory lock shared by every thread and process that uses
+    the same lock file.
+
+    flock() does not exclude threads that share a descriptor, so the
+    process-wide instance from for_path() pairs it with a thread lock. The
+    lock is re-entrant: a thread that holds it can take it again.
+    """
+
+    _instances: Dict[str, "FileLock"] = {}
+    _instances_lock = threading.Lock()
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self._fd: Optional[int] = None
+        self._thread_lock = threading.RLock()
+        self._depth = 0
+
+    @classmethod
+    def for_path(cls, path: Path) -> "FileLock":
+        """The process-wide lock for `path`."""
+        key = str(Path(path).resolve())
+        with cls._instances_lock:
+            if key not in cls._instances:
+                cls._instances[key] = cls(Path(key))
+            return cls._instances[key]
+
+    def __enter__(self) -> "FileLock":
+        self._thread_lock.acquire()
+        try:
+            if self._depth == 0 and fcntl is not None:
+                if self._fd is None:
+                    self.path.parent.mkdir(parents=True, exist_ok=True)
+                    self._fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+                fcntl.flock(self._fd, fcntl.LOCK_EX)
+        except BaseException:
+            self._thread_lock.release()
+            raise
+        self._depth += 1
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self._depth -= 1
+        if self._depth == 0 and self._fd is not None:
+            fcntl.flock(self._fd, fcntl.LOCK_UN)
+        self._thread_lock.release()
+
+
+def hold_for_process(path: Path, exclusive: bool) -> Optional[int]:
+    """
+    Take a shared or exclusive flock on `path` without waiting and keep it
+    until the process exits (the descriptor is returned and never closed).
+
+    Returns None where flock is unavailable.
+
+    Raises:
+        BlockingIOError: Someone else holds a conflicting lock
+    """
+    if fcntl is None:
+        return None
+    Path(path).parent.mkdir(parents=True, exist_ok=True)
+    fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o644)
+    try:
+        fcntl.flock(fd, (fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH) | fcntl.LOCK_NB)
+    except BaseException:
+        os.close(fd)
+        raise
+    return fd
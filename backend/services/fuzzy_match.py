@@ -0,0 +1,251 @@
+import re
+from functools import lru_cache
+from typing import Dict, Hashable, Iterable, List, Set, Tuple
+
+_WORD = re.compile(r"[a-z0-9]+")
+_VOWELS = set("aeiou")
+_FRONT_VOWELS = set("eiy")
+
+# Spoken numbers as ASR tends to spell them
+_NUMBERS = {
+    "zero": "0", "one": "1", "two": "2", "three": "3", "four": "4", "five": "5",
+    "six": "6", "seven": "7", "eight": "8", "nine": "9", "ten": "10",
+    "eleven": "11", "twelve": "12",
+}
+# Title words that carry little meaning and count for less when missing
+_MINOR_WORDS = {"the", "a", "an", "of", "and", "in", "on", "to", "part"}
+MINOR_WEIGHT = 0.2
+# Similarity credited to words that are spelled differently but sound the same
+PHONETIC_SIMILARITY = 0.9
+
+
+def words(text: str) -> List[str]:
+    """Lowercase alphanumeric words of `text`, with spoken numbers as digits."""
+    return [_NUMBERS.get(word, word) for word in _WORD.findall(text.lower())]
+
+
+def metaphone(word: str) -> str:
+    """
+    Metaphone key of a lowercase word (after Lawrence Philips, 1990).
+
+    Words that sound alike get the same key: "know" and "no" are both "N",
+    "phoenix" and "fenix" both "FNKS". Words with digits are their own key.
+
+    >>> [metaphone(w) for w in ("home", "he", "hey", "high", "night", "nation", "vision", "thought")]
+    ['HM', 'H', 'H', 'H', 'NT', 'NXN', 'FXN', '0T']
+    """
+    if not word.isalpha():
+        return word
+    for prefix, replacement in (("ae", "e"), ("gn", "n"), ("kn", "n"), ("pn", "n"), ("wr", "r"), ("wh", "w")):
+        if word.startswith(prefix):
+            word = replacement + word[2:]
+            break
+    if word.startswith("x"):
+        word = "s" + word[1:]
+
+    key = []
+    n = len(word)
+    for i, c in enumerate(word):
+        prev = word[i - 1] if i else ""
+        nxt = word[i + 1] if i + 1 < n else ""
+        after = word[i + 2] if i + 2 < n else ""
+        if c == prev and c != "c":
+            continue
+        if c in _VOWELS:
+            if i == 0:
+                key.append(c.upper())
+        elif c == "b":
+            if not (prev == "m" and i == n - 1):
+                key.append("B")
+        elif c == "c":
+            if nxt == "i" and after == "a" or nxt == "h" and prev != "s":
+                key.append("X")
+            elif nxt in _FRONT_VOWELS:
+                if prev != "s":
+                    key.append("S")
+            else:
+                key.append("K")
+        elif c == "d":
+            key.append("J" if nxt == "g" and after in _FRONT_VOWELS else "T")
+        elif c == "g":
+            if nxt == "h" and after not in _VOWELS:
+                continue  # "gh" before a consonant or at the end is silent ("night", "high")
+            if nxt == "n" and (i + 2 == n or word[i + 2:] == "ed"):
+                continue  # "sign", "signed"
+            if prev == "d" and nxt in _FRONT_VOWELS:
+                continue  # "edge": the "dg" already made a J
+            key.append("J" if nxt in _FRONT_VOWELS and prev != "g" else "K")
+        elif c == "h":
+            if prev and prev in "cgpst":
+                continue
+            if prev in _VOWELS and nxt not in _VOWELS:
+                continue
+            key.append("H")
+        elif c == "k":
+            if prev != "c":
+                key.append("K")
+        elif c == "p":
+            key.append("F" if nxt == "h" else "P")
+        elif c == "q":
+            key.append("K")
+        elif c == "s":
+            key.append("X" if nxt == "h" or nxt == "i" and after and after in "oa" else "S")
+        elif c == "t":
+            if nxt == "i" and after and after in "oa":
+                key.append("X")
+            elif nxt == "h":
+                key.append("0")
+            elif not (nxt == "c" and after == "h"):
+                key.append("T")
+        elif c == "v":
+            key.append("F")
+        elif c in "wy":
+            if nxt in _VOWELS:
+                key.append(c.upper())
+        elif c == "x":
+            key.append("KS")
+        elif c == "z":
+            key.append("S")
+        else:
+            key.append(c.upper())
+    return "".join(key)
+
+
+def _deletes(word: str) -> Set[str]:
+    """`word` and every string one deletion away from it."""
+    return {word} | {word[:i] + word[i + 1:] for i in range(len(word))}
+
+
+def _edit_distance(a: str, b: str) -> int:
+    """Levenshtein distance (both words are short)."""
+    if len(a) < len(b):
+        a, b = b, a
+    previous = list(range(len(b) + 1))
+    for i, ca in enumerate(a, 1):
+        current = [i]
+        for j, cb in enumerate(b, 1):
+            current.append(min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (ca != cb)))
+        previous = current
+    return previous[-1]
+
+
+def _similarity(a: str, b: str) -> float:
+    if a == b:
+        return 1.0
+    spelled = 1.0 - _edit_distance(a, b) / max(len(a), len(b))
+    # Short words are easily one letter from an unrelated word
+    if min(len(a), len(b)) < 4:
+        spelled = 0.0
+    if metaphone(a) == metaphone(b):
+        return max(spelled, PHONETIC_SIMILARITY)
+    return spelled
+
+
+# (item index, title word positions the unit covers)
+_Occurrence = Tuple[int, Tuple[int, ...]]
+
+
+class FuzzyMatcher:
+    """
+    Ranks items by how well a spoken query matches their title, so ASR and
+    phrasing slips ("avenger end game", "spider man know way home") still
+    find the movie.
+
+    Built once per catalog snapshot. Each title contributes "units": every
+    word and every pair of neighbouring words joined up, so "end game"
+    meets "endgame" and "spiderman" meets "spider man". Units are indexed
+    by Metaphone key and by their one-deletion variants (any two words
+    within two edits share one), so a query word is only ever compared
+    with the handful of units near it, never scanned against the catalog.
+    Lookups per query word are memoized, since callers tend to retry
+    variations of the same words.
+
+    A query's words (and joined neighbours) look up similar units. Each
+    item then scores the average best similarity of the query's words
+    (precision) averaged with that of its own title words, where minor
+    words such as "the" count for less (recall). The score is in [0, 1].
+    """
+
+    # Query words (and joined pairs) whose similar units are remembered
+    CACHED_WORDS = 4096
+
+    def __init__(self, items: Iterable[Tuple[Hashable, str]]):
+        """
+        Args:
+            items: (item, title) pairs, e.g. (movie id, movie title)
+        """
+        self._items: List[Hashable] = []
+        self._title_weights: List[List[float]] = []
+        self._units: Dict[str, List[_Occurrence]] = {}
+        self._by_sound: Dict[str, Set[str]] = {}
+        self._by_delete: Dict[str, Set[str]] = {}
+        for index, (item, title) in enumerate(items):
+            title_words = words(title)
+            self._items.append(item)
+            self._title_weights.append([MINOR_WEIGHT if w in _MINOR_WORDS else 1.0 for w in title_words])
+            for unit, positions in self._spans(title_words):
+                self._units.setdefault(unit, []).append((index, positions))
+        for unit in self._units:
+            self._by_sound.setdefault(metaphone(unit), set()).add(unit)
+            for variant in _deletes(unit):
+                self._by_delete.setdefault(variant, set()).add(unit)
+        self._similar_units = lru_cache(maxsize=self.CACHED_WORDS)(self._similar_units)
+
+    @staticmethod
+    def _spans(title_words: List[str]) -> List[Tuple[str, Tuple[int, ...]]]:
+        """Every word and every joined pair of neighbouring words, with positions."""
+        spans = [(word, (i,)) for i, word in enumerate(title_words)]
+        spans += [(title_words[i] + title_words[i + 1], (i, i + 1)) for i in range(len(title_words) - 1)]
+        return spans
+
+    def _similar_units(self, unit: str) -> Dict[str, float]:
+        """Indexed units close to `unit`, with their similarity."""
+        candidates = set(self._by_sound.get(metaphone(unit), ()))
+        for variant in _deletes(unit):
+            candidates |= self._by_delete.get(variant, set())
+        scored = {}
+        for candidate in candidates:
+            similarity = _similarity(unit, candidate)
+            if similarity > 0:
+                scored[candidate] = similarity
+        return scored
+
+    def match(self, query: str, limit: int = 5, min_score: float = 0.0) -> List[Tuple[Hashable, float]]:
+        """
+        Items whose titles best match `query`.
+
+        Args:
+            query: What the caller said
+            limit: Most results to return
+            min_score: Leave out items scoring below this
+
+        Returns:
+            (item, score) pairs, best first
+        """
+        query_words = words(query)
+        if not query_words:
+            return []
+        # item index -> best similarity per query word / per title word
+        query_best: Dict[int, List[float]] = {}
+        title_best: Dict[int, List[float]] = {}
+        for unit, query_positions in self._spans(query_words):
+            for candidate, similarity in self._similar_units(unit).items():
+                for index, title_positions in self._units[candidate]:
+                    if index not in query_best:
+                        query_best[index] = [0.0] * len(query_words)
+                        title_best[index] = [0.0] * len(self._title_weights[index])
+                    for position in query_positions:
+                        query_best[index][position] = max(query_best[index][position], similarity)
+                    for position in title_positions:
+                        title_best[index][position] = max(title_best[index][position], similarity)
+
+        results = []
+        for index, best in query_best.items():
+            weights = self._title_weights[index]
+            precision = sum(best) / len(best)
+            recall = sum(w * s for w, s in zip(weights, title_best[index])) / sum(weights)
+            score = round((precision + recall) / 2, 3)
+            if score >= min_score:
+                results.append((score, -index, self._items[index]))
+        results.sort(reverse=True)
+        return [(item, score) for score, _, item in results[:limit]]
@@ -1,24 +1,135 @@
-import json
-from typing import List, Optional, Dict, Any
+import re
+import threading
+from functools import cached_property
+from typing import Hashable, List, Optional, Dict, Any, Set, Tuple
 from pathlib import Path
 
 from models.movie import Movie
+from services.executors import run_storage
+from services.fuzzy_match import FuzzyMatcher
+from services.ngram_index import TrigramIndex
+from services.prefix_index import PrefixIndex
+from services.serializers import paused_gc
+from services.repository import Repository, get_repository
+
+
+_NON_ALNUM = re.compile(r"[^a-z0-9]")
+
+
+def normalize(text: str) -> str:
+    """Lowercase and drop every non-alphanumeric char, so "Spider-Man" -> "spiderman"."""
+    return _NON_ALNUM.sub("", text.lower())
+
+
+def _rating(movie: Dict[str, Any]) -> float:
+    """A movie's rating as a number (ratings are stored as strings like "8.4")."""
+    try:
+        return float(movie.get("rating", 0))
+    except (TypeError, ValueError):
+        return 0.0
+
+
+class CatalogSnapshot:
+    """
+    One parsed version of the catalog plus the views derived from it.
+
+    Never modified after construction: MovieService swaps in a new snapshot
+    instead, so readers holding the old one always see a consistent catalog.
+    Normalized text and the search index are carried over from the
+    previous snapshot, so only movies that changed are re-normalized and
+    re-indexed.
+    """
+
+    def __init__(self, stamp: Hashable, movies: List[Dict[str, Any]],
+                 previous: Optional["CatalogSnapshot"] = None):
+        self.stamp = stamp
+        self.movies = movies
+        self.by_id = {movie["id"]: movie for movie in movies}
+        self.position = {movie["id"]: i for i, movie in enumerate(movies)}
+        self.by_genre: Dict[str, List[Dict[str, Any]]] = {}
+        for movie in movies:
+            self.by_genre.setdefault(movie["genre"].lower(), []).append(movie)
+        # raw title or genre -> normalize()d, reusing the previous snapshot's work
+        known = previous.normalized_text if previous is not None else {}
+        self.normalized_text: Dict[str, str] = {}
+        for movie in movies:
+            for text in (movie["title"], movie["genre"]):
+                if text not in self.normalized_text:
+                    self.normalized_text[text] = known[text] if text in known else normalize(text)
+        # (normalized title, normalized genre, movie) for substring search
+        self.normalized = [(self.normalized_text[m["title"]], self.normalized_text[m["genre"]], m)
+                           for m in movies]
+        base = previous.search_index if previous is not None else TrigramIndex()
+        self.search_index = base.updated({m["id"]: (title, genre) for title, genre, m in self.normalized})
+        self.showings = frozenset((movie["id"], showtime)
+                                  for movie in movies
+                                  for showtime in movie.get("showtimes", []))
+    
+    @cached_property
+    def suggest_index(self) -> PrefixIndex:
+        """
+        Title prefixes -> movie ids by rating, built on first use.
+        
+        Every word start is a key ("Spider-Man: No Way Home" is found by
+        "spi", "man", "noway", ...), and ties go to the earlier movie.
+        """
+        with paused_gc():
+            entries = []
+            for movie in self.movies:
+                words = [w for w in _NON_ALNUM.split(movie["title"].lower()) if w]
+                entries.extend(("".join(words[i:]), movie["id"]) for i in range(len(words)))
+            score = {movie["id"]: (_rating(movie), -self.position[movie["id"]]) for movie in self.movies}
+            return PrefixIndex(entries, score)
+    
+    @cached_property
+    def fuzzy_matcher(self) -> FuzzyMatcher:
+        """Spoken-title matcher over movie ids (see services/fuzzy_match.py), built on first use."""
+        with paused_gc():
+            return FuzzyMatcher((movie["id"], movie["title"]) for movie in self.movies)
 
 
 class MovieService:
-    """Service for managing movies using JSON file storage."""
+    """
+    Service for managing movies (movies.json unless configured otherwise).
     
-    def __init__(self):
-        self.data_dir = Path(__file__).parent.parent / "data"
-        self.movies_file = self.data_dir / "movies.json"
+    The parsed catalog is kept in memory as a CatalogSnapshot. Each read
+    compares the store's change stamp ((mtime, size, inode) of the file,
+    see Repository.stamp) with the snapshot's and only re-reads when it
+    moved; a reload builds a whole new snapshot and swaps it in with one
+    assignment. Returned movie dicts are shared, so treat them as read-only.
+    """
+    
+    def __init__(self, data_dir: Optional[Path] = None, repository: Optional[Repository] = None):
+        self._repo = repository or get_repository("movies", data_dir)
+        self._snapshot: Optional[CatalogSnapshot] = None
+        self._reload_lock = threading.Lock()
+    
+    def _catalog(self) -> CatalogSnapshot:
+        """The current snapshot, reloaded first if the store changed."""
+        snapshot = self._snapshot
+        if snapshot is not None and snapshot.stamp == self._repo.stamp():
+            return snapshot
+        with self._reload_lock:
+            # Stamp before reading: a write in between shows up as a change next time
+            stamp = self._repo.stamp()
+            if self._snapshot is None or self._snapshot.stamp != stamp:
+                movies = self._repo.load_all()
+                with paused_gc():
+                    self._snapshot = CatalogSnapshot(stamp, movies, self._snapshot)
+            return self._snapshot
     
     def _load_movies(self) -> List[Dict[str, Any]]:
-        """Load movies from JSON file."""
-        try:
-            with open(self.movies_file, 'r') as f:
-                return json.load(f)
-        except (FileNotFoundError, json.JSONDecodeError):
-            return []
+        """Load movies from the repository."""
+        return self._catalog().movies
+    
+    def catalog_version(self) -> Hashable:
+        """
+        A value that changes whenever the catalog does.
+        
+        This is the store's change stamp, so it costs a stat (or one SQLite
+        lookup) rather than a load.
+        """
+        return self._catalog().stamp
     
     def get_all_movies(self) -> List[Dict[str, Any]]:
         """
@@ -27,7 +138,7 @@ class MovieService:
         Returns:
             List of all movies
         """
-        return self._load_movies()
+        return list(self._load_movies())
     
     def get_movie_by_id(self, movie_id: str) -> Optional[Dict[str, Any]]:
         """
@@ -39,27 +150,81 @@ class MovieService:
         Returns:
             Movie dict if found, None otherwise
         """
-        movies = self._load_movies()
-        for movie in movies:
-            if movie["id"] == movie_id:
-                return movie
-        return None
+        return self._catalog().by_id.get(movie_id)
+    
+    def get_scheduled_showings(self) -> Set[Tuple[str, str]]:
+        """
+        Get every showing on the current schedule.
+        
+        Returns:
+            Set of (movie_id, showtime) pairs
+        """
+        return set(self._catalog().showings)
     
     def search_movies(self, query: str) -> List[Dict[str, Any]]:
-        import re
-        movies = self._load_movies()
-
-        def normalize(s):
-            # Remove all non-alphanumeric chars so "Spider-Man" -> "spiderman"
-            return re.sub(r"[^a-z0-9]", "", s.lower())
-
+        """
+        Movies whose title or genre contains `query`, ignoring case and punctuation.
+        
+        Queries of three or more characters are answered from the trigram
+        index (only its candidates are checked); shorter ones scan the
+        normalized titles and genres.
+        
+        Args:
+            query: Search text
+            
+        Returns:
+            Matching movies in catalog order
+        """
         q = normalize(query)
         if not q:
             return []
-        return [
-            m for m in movies
-            if q in normalize(m["title"]) or q in normalize(m["genre"])
-        ]
+        catalog = self._catalog()
+        candidates = catalog.search_index.candidates(q)
+        if candidates is None:
+            return [m for title, genre, m in catalog.normalized if q in title or q in genre]
+        matches = []
+        for i in sorted(catalog.position[movie_id] for movie_id in candidates):
+            title, genre, movie = catalog.normalized[i]
+            if q in title or q in genre:
+                matches.append(movie)
+        return matches
+    
+    def suggest(self, prefix: str, limit: int = 8) -> List[Dict[str, Any]]:
+        """
+        Autocomplete: best-rated movies with a title word starting with `prefix`.
+        
+        Args:
+            prefix: What the user has typed so far (case and punctuation ignored)
+            limit: Most suggestions to return
+            
+        Returns:
+            Movies, highest rating first
+        """
+        q = normalize(prefix)
+        if not q:
+            return []
+        catalog = self._catalog()
+        return [catalog.by_id[movie_id] for movie_id in catalog.suggest_index.lookup(q, limit)]
+    
+    def match_movies(self, query: str, limit: int = 5,
+                     min_score: float = 0.0) -> List[Tuple[Dict[str, Any], float]]:
+        """
+        Movies whose titles sound or read like `query`, for loosely worded lookups.
+        
+        Tolerates misspellings, mishearings ("know way home") and words run
+        together or split apart ("end game").
+        
+        Args:
+            query: Free-form title, e.g. a voice transcript
+            limit: Most candidates to return
+            min_score: Leave out candidates scoring below this (scores are 0-1)
+            
+        Returns:
+            (movie, score) pairs, best first
+        """
+        catalog = self._catalog()
+        return [(catalog.by_id[movie_id], score)
+                for movie_id, score in catalog.fuzzy_matcher.match(query, limit, min_score)]
     
     def get_movies_by_genre(self, genre: str) -> List[Dict[str, Any]]:
         """
@@ -71,5 +236,39 @@ class MovieService:
         Returns:
             List of movies in the genre
         """
-        movies = self._load_movies()
-        return [movie for movie in movies if movie["genre"].lower() == genre.lower()]
\ No newline at end of file
+        return list(self._catalog().by_genre.get(genre.lower(), []))
+    
+    # Async entry points for route handlers (storage pool, see services/executors.py)
+    
+    async def catalog_version_async(self) -> Hashable:
+        return await run_storage(self.catalog_version)
+    
+    async def get_all_movies_async(self) -> List[Dict[str, Any]]:
+        return await run_storage(self.get_all_movies)
+    
+    async def get_movie_by_id_async(self, movie_id: str) -> Optional[Dict[str, Any]]:
+        return await run_storage(self.get_movie_by_id, movie_id)
+    
+    async def search_movies_async(self, query: str) -> List[Dict[str, Any]]:
+        return await run_storage(self.search_movies, query)
+    
+    async def suggest_async(self, prefix: str, limit: int = 8) -> List[Dict[str, Any]]:
+        return await run_storage(self.suggest, prefix, limit)
+    
+    async def match_movies_async(self, query: str, limit: int = 5,
+                                 min_score: float = 0.0) -> List[Tuple[Dict[str, Any], float]]:
+        return await run_storage(self.match_movies, query, limit, min_score)
+    
+    async def get_movies_by_genre_async(self, genre: str) -> List[Dict[str, Any]]:
+        return await run_storage(self.get_movies_by_genre, genre)
+
+
+_movie_service: Optional[MovieService] = None
+
+
+def get_movie_service() -> MovieService:
+    """Process-wide MovieService (one cached catalog) shared by the HTTP routes and voice tools."""
+    global _movie_service
+    if _movie_service is None:
+        _movie_service = MovieService()
+    return _movie_service
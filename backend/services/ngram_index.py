@@ -0,0 +1,87 @@
+from typing import Dict, FrozenSet, Hashable, Optional, Set, Tuple
+
+N = 3
+_EMPTY: FrozenSet[Hashable] = frozenset()
+
+
+def trigrams(text: str) -> Set[str]:
+    """Every run of N consecutive characters in `text`."""
+    return {text[i:i + N] for i in range(len(text) - N + 1)}
+
+
+class TrigramIndex:
+    """
+    Character-trigram inverted index for substring search over short fields.
+
+    Every entry is a key (e.g. a movie id) with a few text fields. A query
+    of N or more characters can only occur in an entry that contains all of
+    its trigrams, so candidates are the intersection of those trigrams'
+    posting sets, smallest first; callers still confirm the substring.
+
+    An index is never modified once built. updated() derives the index for
+    a new set of entries from an old one, copying only the posting sets
+    touched by entries that were added, removed or changed, so a catalog
+    reload costs in proportion to what changed while readers of the old
+    index carry on undisturbed.
+    """
+
+    def __init__(self):
+        self._fields: Dict[Hashable, Tuple[str, ...]] = {}
+        self._postings: Dict[str, Set[Hashable]] = {}
+
+    def __len__(self) -> int:
+        return len(self._fields)
+
+    def updated(self, entries: Dict[Hashable, Tuple[str, ...]]) -> "TrigramIndex":
+        """
+        An index over `entries`, reusing this one's postings where nothing changed.
+
+        Args:
+            entries: key -> text fields (already normalized)
+
+        Returns:
+            A new TrigramIndex; this one is left as it was
+        """
+        index = TrigramIndex()
+        index._fields = dict(entries)
+        index._postings = dict(self._postings)
+        copied: Set[str] = set()
+
+        def editable(gram: str) -> Set[Hashable]:
+            # Posting sets may be shared with older indexes: copy before the first change.
+            if gram not in copied:
+                index._postings[gram] = set(index._postings.get(gram, ()))
+                copied.add(gram)
+            return index._postings[gram]
+
+        for key, fields in self._fields.items():
+            if entries.get(key) != fields:
+                for gram in set().union(*map(trigrams, fields)):
+                    editable(gram).discard(key)
+        for key, fields in entries.items():
+            if self._fields.get(key) != fields:
+                for gram in set().union(*map(trigrams, fields)):
+                    editable(gram).add(key)
+        for gram in copied:
+            if not index._postings[gram]:
+                del index._postings[gram]
+        return index
+
+    def candidates(self, query: str) -> Optional[Set[Hashable]]:
+        """
+        Keys whose fields contain every trigram of `query`.
+
+        Returns:
+            The candidate keys, or None if `query` is shorter than N
+            characters and the index cannot narrow it down
+        """
+        grams = trigrams(query)
+        if not grams:
+            return None
+        postings = sorted((self._postings.get(gram, _EMPTY) for gram in grams), key=len)
+        result = set(postings[0])
+        for posting in postings[1:]:
+            if not result:
+                break
+            result &= posting
+        return result
@@ -0,0 +1,205 @@
+import asyncio
+import json
+import threading
+import time
+from typing import Dict, Optional, Set, Tuple
+
+from services.booking_service import get_booking_service
+from services.seat_map import mask_to_seats
+
+ShowingKey = Tuple[str, str]
+
+
+class HubMessage:
+    """One event, encoded once for every kind of viewer."""
+
+    __slots__ = ("event", "seq", "sse", "json")
+
+    def __init__(self, event: str, seq: int, data: dict):
+        self.event = event
+        self.seq = seq
+        self.sse = f"event: {event}\nid: {seq}\ndata: {json.dumps(data, separators=(',', ':'))}\n\n"
+        self.json = json.dumps({"type": event, "seq": seq, **data}, separators=(",", ":"))
+
+
+class Subscription:
+    """
+    One viewer of a showing: a bounded queue of ready-to-send messages.
+
+    Messages carry the showing's sequence number; anything at or below the
+    last one taken is skipped, so a resync snapshot makes older deltas that
+    are still in flight harmless.
+    """
+
+    def __init__(self, hub: "OccupancyHub", key: ShowingKey, loop: asyncio.AbstractEventLoop, maxsize: int):
+        self.key = key
+        self._hub = hub
+        self._loop = loop
+        self._queue: "asyncio.Queue[HubMessage]" = asyncio.Queue(maxsize)
+        self._seq = 0
+        # Set by the hub: send a full snapshot instead of the next delta
+        self.needs_snapshot = True
+
+    def push(self, message: HubMessage) -> None:
+        """Queue a message from any thread."""
+        self._loop.call_soon_threadsafe(self._deliver, message)
+
+    def _deliver(self, message: HubMessage) -> None:
+        try:
+            self._queue.put_nowait(message)
+        except asyncio.QueueFull:
+            # Too far behind to catch up from deltas: drop them and start over.
+            while not self._queue.empty():
+                self._queue.get_nowait()
+            self._hub.resync(self)
+
+    async def next(self, timeout: float) -> Optional[HubMessage]:
+        """The next message, or None if nothing arrived within `timeout` seconds."""
+        deadline = self._loop.time() + timeout
+        while True:
+            remaining = deadline - self._loop.time()
+            if remaining <= 0:
+                return None
+            try:
+                message = await asyncio.wait_for(self._queue.get(), remaining)
+            except asyncio.TimeoutError:
+                return None
+            if message.seq > self._seq or message.event == "snapshot":
+                self._seq = message.seq
+                return message
+
+    def close(self) -> None:
+        self._hub.unsubscribe(self)
+
+
+class OccupancyHub:
+    """
+    In-process publish/subscribe for seat occupancy, one channel per showing.
+
+    BookingService calls publish() (as a listener, under its store lock, so
+    calls arrive in commit order) with a showing's booked and held masks
+    after every change. The hub diffs them against the last state it saw,
+    encodes the delta once (as SSE and as JSON, see HubMessage) and hands
+    that same message to every subscriber of the showing, so the cost of a
+    change does not grow with the number of viewers. Showings nobody
+    watches are ignored.
+
+    New subscribers get a snapshot on the next publish for their showing;
+    the stream route triggers one right away via BookingService.refresh_showings.
+    """
+
+    def __init__(self, queue_size: int = 256):
+        self.queue_size = queue_size
+        self._lock = threading.Lock()
+        self._subscribers: Dict[ShowingKey, Set[Subscription]] = {}
+        # showing -> (booked mask, held mask, sequence number)
+        self._state: Dict[ShowingKey, Tuple[int, int, int]] = {}
+        self._refreshed: Dict[ShowingKey, float] = {}
+
+    def subscribe(self, key: ShowingKey) -> Subscription:
+        """Register a viewer; must be called on the event loop that will read it."""
+        subscription = Subscription(self, key, asyncio.get_running_loop(), self.queue_size)
+        with self._lock:
+            self._subscribers.setdefault(key, set()).add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        with self._lock:
+            subscribers = self._subscribers.get(subscription.key)
+            if subscribers is None:
+                return
+            subscribers.discard(subscription)
+            if not subscribers:
+                del self._subscribers[subscription.key]
+                self._state.pop(subscription.key, None)
+                self._refreshed.pop(subscription.key, None)
+
+    def due_for_refresh(self, key: ShowingKey, interval: float) -> bool:
+        """
+        True at most once per `interval` seconds per showing.
+
+        Lets every viewer's stream ask for a periodic re-read (to pick up
+        lapsed holds and other workers' bookings) while only one of them
+        actually does it.
+        """
+        now = time.monotonic()
+        with self._lock:
+            if now - self._refreshed.get(key, 0.0) < interval:
+                return False
+            self._refreshed[key] = now
+            return True
+
+    def publish(self, key: ShowingKey, booked: int, held: int) -> None:
+        """Record a showing's current occupancy and fan out what changed."""
+        with self._lock:
+            subscribers = self._subscribers.get(key)
+            if not subscribers:
+                return
+            previous = self._state.get(key)
+            delta = None
+            if previous is None or previous[:2] != (booked, held):
+                seq = previous[2] + 1 if previous else 1
+                self._state[key] = (booked, held, seq)
+                if previous is not None:
+                    delta = self._delta_message(key, previous, booked, held, seq)
+            else:
+                seq = previous[2]
+            snapshot = None
+            for subscription in list(subscribers):
+                if subscription.needs_snapshot:
+                    subscription.needs_snapshot = False
+                    snapshot = snapshot or self._snapshot_message(key, booked, held, seq)
+                    self._push(subscription, snapshot)
+                elif delta is not None:
+                    self._push(subscription, delta)
+
+    def resync(self, subscription: Subscription) -> None:
+        """Send a subscriber a fresh snapshot (after it fell behind)."""
+        with self._lock:
+            state = self._state.get(subscription.key)
+            if state is None:
+                subscription.needs_snapshot = True
+                return
+            booked, held, seq = state
+            self._push(subscription, self._snapshot_message(subscription.key, booked, held, seq))
+
+    def _push(self, subscription: Subscription, message: HubMessage) -> None:
+        try:
+            subscription.push(message)
+        except RuntimeError:
+            # Its event loop is gone; so is the viewer.
+            self._subscribers[subscription.key].discard(subscription)
+
+    @staticmethod
+    def _snapshot_message(key: ShowingKey, booked: int, held: int, seq: int) -> HubMessage:
+        return HubMessage("snapshot", seq, {
+            "movie_id": key[0],
+            "showtime": key[1],
+            "booked_seats": mask_to_seats(booked),
+            "held_seats": mask_to_seats(held),
+        })
+
+    @staticmethod
+    def _delta_message(key: ShowingKey, previous: Tuple[int, int, int],
+                       booked: int, held: int, seq: int) -> HubMessage:
+        old_booked, old_held, _ = previous
+        return HubMessage("delta", seq, {
+            "movie_id": key[0],
+            "showtime": key[1],
+            "booked": mask_to_seats(booked & ~old_booked),
+            "unbooked": mask_to_seats(old_booked & ~booked),
+            "held": mask_to_seats(held & ~old_held),
+            "released": mask_to_seats(old_held & ~held),
+        })
+
+
+_hub: Optional[OccupancyHub] = None
+
+
+def get_occupancy_hub() -> OccupancyHub:
+    """Process-wide hub, registered as a listener on the shared BookingService."""
+    global _hub
+    if _hub is None:
+        _hub = OccupancyHub()
+        get_booking_service().add_listener(_hub.publish)
+    return _hub
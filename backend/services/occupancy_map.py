@@ -0,0 +1,176 @@
+import hashlib
+import mmap
+import os
+import struct
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, Iterator, Optional, Tuple
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+
+ShowingKey = Tuple[str, str]
+
+DEFAULT_SLOTS = 4096
+
+MAGIC = b"TNBOCC01"
+# magic, slot count, reserved
+HEADER = struct.Struct("<8sII")
+# key hash (0 = empty), seat mask, version (odd while a write is in progress)
+SLOT = struct.Struct("<QQQ")
+
+
+class SharedOccupancy:
+    """
+    Booked-seat bitmaps of every showing in a fixed-layout file that all
+    worker processes memory-map.
+
+    The file is a header followed by an open-addressed table of slots, one
+    per showing, each holding the showing's key hash, its 64-bit seat mask
+    (see services/seat_map.py) and a version counter. Slots are never
+    freed, so a key keeps its position for the life of the file.
+
+    Reads take no lock and copy nothing but the 8-byte mask: the version is
+    a seqlock, so a reader that races a writer simply reads again. Writes
+    are compare-and-set under an exclusive flock on the file (plus a thread
+    lock, since flock does not exclude threads sharing one descriptor).
+    """
+
+    def __init__(self, path: Path, slots: int = DEFAULT_SLOTS):
+        if fcntl is None:
+            raise RuntimeError("The shared occupancy file needs fcntl (POSIX only)")
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+        self._thread_lock = threading.RLock()
+        self._depth = 0
+        with self.lock():
+            if os.fstat(self._fd).st_size < HEADER.size:
+                os.ftruncate(self._fd, HEADER.size + slots * SLOT.size)
+                os.pwrite(self._fd, HEADER.pack(MAGIC, slots, 0), 0)
+            magic, self.slots, _ = HEADER.unpack(os.pread(self._fd, HEADER.size, 0))
+            if magic != MAGIC:
+                raise ValueError(f"{self.path} is not an occupancy file")
+        self._map = mmap.mmap(self._fd, HEADER.size + self.slots * SLOT.size)
+
+    @contextmanager
+    def lock(self) -> Iterator[None]:
+        """Exclusive writer lock across threads and processes (re-entrant)."""
+        with self._thread_lock:
+            if self._depth == 0:
+                fcntl.flock(self._fd, fcntl.LOCK_EX)
+            self._depth += 1
+            try:
+                yield
+            finally:
+                self._depth -= 1
+                if self._depth == 0:
+                    fcntl.flock(self._fd, fcntl.LOCK_UN)
+
+    @staticmethod
+    def _hash(key: ShowingKey) -> int:
+        digest = hashlib.blake2b(f"{key[0]}\0{key[1]}".encode(), digest_size=8).digest()
+        return int.from_bytes(digest, "little") or 1
+
+    def _offset(self, index: int) -> int:
+        return HEADER.size + index * SLOT.size
+
+    def _find(self, key: ShowingKey, claim: bool = False) -> Optional[int]:
+        """
+        Offset of the key's slot (linear probing).
+
+        With claim=True an empty slot is taken for the key; the caller must
+        hold the lock. Returns None if the key has no slot.
+        """
+        h = self._hash(key)
+        start = h % self.slots
+        for i in range(self.slots):
+            offset = self._offset((start + i) % self.slots)
+            (slot_hash,) = struct.unpack_from("<Q", self._map, offset)
+            if slot_hash == h:
+                return offset
+            if slot_hash == 0:
+                if not claim:
+                    return None
+                struct.pack_into("<Q", self._map, offset, h)
+                return offset
+        if claim:
+            raise ValueError(f"Occupancy file is full ({self.slots} showings)")
+        return None
+
+    def get(self, key: ShowingKey) -> int:
+        """Booked-seat mask of a showing (0 if it has none)."""
+        offset = self._find(key)
+        if offset is None:
+            return 0
+        for _ in range(1000):
+            (before,) = struct.unpack_from("<Q", self._map, offset + 16)
+            if before & 1:
+                continue
+            (mask,) = struct.unpack_from("<Q", self._map, offset + 8)
+            (after,) = struct.unpack_from("<Q", self._map, offset + 16)
+            if before == after:
+                return mask
+        # Still odd: a writer died mid-update. Under the lock nobody is writing.
+        with self.lock():
+            (mask,) = struct.unpack_from("<Q", self._map, offset + 8)
+            return mask
+
+    def _write(self, offset: int, mask: int) -> None:
+        (version,) = struct.unpack_from("<Q", self._map, offset + 16)
+        struct.pack_into("<Q", self._map, offset + 16, version + 1)
+        struct.pack_into("<Q", self._map, offset + 8, mask)
+        struct.pack_into("<Q", self._map, offset + 16, version + 2)
+
+    def compare_and_set(self, key: ShowingKey, expected: int, new: int) -> bool:
+        """
+        Replace a showing's mask with `new` if it still equals `expected`.
+
+        Returns:
+            True if the mask was updated
+        """
+        with self.lock():
+            offset = self._find(key, claim=bool(new))
+            if offset is None:
+                return expected == 0
+            (current,) = struct.unpack_from("<Q", self._map, offset + 8)
+            if current != expected:
+                return False
+            if current != new:
+                self._write(offset, new)
+            return True
+
+    def rebuild(self, masks: Dict[ShowingKey, int]) -> None:
+        """Make the file match `masks` exactly (showings not in it become empty)."""
+        with self.lock():
+            wanted = {self._hash(key): mask for key, mask in masks.items()}
+            for i in range(self.slots):
+                offset = self._offset(i)
+                slot_hash, mask, _ = SLOT.unpack_from(self._map, offset)
+                if slot_hash and mask != wanted.get(slot_hash, 0):
+                    self._write(offset, wanted.get(slot_hash, 0))
+            for key, mask in masks.items():
+                if mask:
+                    offset = self._find(key, claim=True)
+                    (current,) = struct.unpack_from("<Q", self._map, offset + 8)
+                    if current != mask:
+                        self._write(offset, mask)
+
+    def close(self) -> None:
+        self._map.close()
+        os.close(self._fd)
+
+
+def shared_occupancy_from_env() -> Optional[SharedOccupancy]:
+    """
+    The SharedOccupancy configured by OCCUPANCY_FILE (and OCCUPANCY_SLOTS),
+    or None when OCCUPANCY_FILE is not set.
+    """
+    path = os.getenv("OCCUPANCY_FILE")
+    if not path:
+        return None
+    return SharedOccupancy(Path(path), int(os.getenv("OCCUPANCY_SLOTS", DEFAULT_SLOTS)))
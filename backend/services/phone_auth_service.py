@@ -1,4 +1,3 @@
-import json
 import re
 import secrets
 import uuid
@@ -7,6 +6,7 @@ from pathlib import Path
 from typing import Any, Dict, Optional
 
 from services.otp_provider import MockOTPProvider, OTPProvider
+from services.repository import Repository, get_repository
 
 
 OTP_TTL = timedelta(minutes=5)
@@ -40,47 +40,24 @@ class PhoneAuthService:
     Manages phone-based authentication for voice users.
 
     OTPs are kept in memory (fine for dev; swap for Redis in prod).
-    Phone-user records persist to data/phone_users.json.
+    Phone-user records persist to data/phone_users.json (or whichever
+    backend services/repository.py is configured for).
     """
 
-    def __init__(self, otp_provider: Optional[OTPProvider] = None):
-        self.data_dir = Path(__file__).parent.parent / "data"
-        self.phone_users_file = self.data_dir / "phone_users.json"
+    def __init__(self, otp_provider: Optional[OTPProvider] = None,
+                 data_dir: Optional[Path] = None, repository: Optional[Repository] = None):
         self.otp_provider = otp_provider or MockOTPProvider()
         # phone_number -> {code, expires_at, attempts}
         self._pending_otps: Dict[str, Dict[str, Any]] = {}
-        self._ensure_file()
-
-    def _ensure_file(self) -> None:
-        """Make sure phone_users.json exists and is a list (migrate {} -> [])."""
-        if not self.phone_users_file.exists():
-            self.phone_users_file.parent.mkdir(parents=True, exist_ok=True)
-            self.phone_users_file.write_text("[]")
-            return
-        try:
-            data = json.loads(self.phone_users_file.read_text() or "[]")
-        except json.JSONDecodeError:
-            data = []
-        if not isinstance(data, list):
-            self.phone_users_file.write_text("[]")
+        self._repo = repository or get_repository("phone_users", data_dir)
 
     def _load(self) -> list:
-        try:
-            data = json.loads(self.phone_users_file.read_text() or "[]")
-            return data if isinstance(data, list) else []
-        except (FileNotFoundError, json.JSONDecodeError):
-            return []
-
-    def _save(self, users: list) -> None:
-        self.phone_users_file.write_text(json.dumps(users, indent=2, default=str))
+        return self._repo.load_all()
 
     def find_by_phone(self, phone_number: str) -> Optional[Dict[str, Any]]:
         """Return the phone user record or None."""
         phone = normalize_phone(phone_number)
-        for u in self._load():
-            if u.get("phone_number") == phone:
-                return u
-        return None
+        return self._repo.find_one("phone_number", phone)
 
     def register(self, phone_number: str, name: Optional[str] = None,
                  linked_user_id: Optional[str] = None) -> Dict[str, Any]:
@@ -96,26 +73,26 @@ class PhoneAuthService:
             The phone user record.
         """
         phone = normalize_phone(phone_number)
-        users = self._load()
-        for u in users:
-            if u.get("phone_number") == phone:
+        # Lookup and insert as one step, so two workers can't both create the number
+        with self._repo.lock():
+            u = self._repo.find_one("phone_number", phone)
+            if u is not None:
                 if name and not u.get("name"):
                     u["name"] = name
                 if linked_user_id and not u.get("linked_user_id"):
                     u["linked_user_id"] = linked_user_id
-                self._save(users)
+                self._repo.put(u)
                 return u
 
-        record = {
-            "id": str(uuid.uuid4()),
-            "phone_number": phone,
-            "name": name,
-            "linked_user_id": linked_user_id,
-            "created_at": datetime.now(timezone.utc).isoformat(),
-        }
-        users.append(record)
-        self._save(users)
-        return record
+            record = {
+                "id": str(uuid.uuid4()),
+                "phone_number": phone,
+                "name": name,
+                "linked_user_id": linked_user_id,
+                "created_at": datetime.now(timezone.utc).isoformat(),
+            }
+            self._repo.put(record)
+            return record
 
     def start_otp(self, phone_number: str) -> Dict[str, Any]:
         """
@@ -0,0 +1,76 @@
+from bisect import bisect_left
+from heapq import nlargest
+from typing import Any, Dict, Hashable, Iterable, List, Tuple
+
+# Sorts after every character normalized keys contain ([a-z0-9])
+_KEY_END = "\x7f"
+
+
+class PrefixIndex:
+    """
+    Best-scoring items whose key starts with a prefix, for search-as-you-type.
+
+    Keys sit in one sorted array, so every key with a given prefix is one
+    contiguous run found with two bisects, and only that run is ranked. The
+    shortest prefixes match a large share of the keys, so their answers are
+    ranked once up front instead, and the answer for any longer prefix with
+    a run over LARGE_RUN keys is kept after it is first ranked.
+
+    Built once per catalog snapshot; the keys never change after that.
+    """
+
+    # Prefixes up to this long are answered from the precomputed table
+    SHORT = 3
+    # Runs longer than this get their ranking remembered
+    LARGE_RUN = 256
+
+    def __init__(self, entries: Iterable[Tuple[str, Hashable]], score: Dict[Hashable, Any], max_k: int = 20):
+        """
+        Args:
+            entries: (key, item) pairs; an item may have several keys
+            score: item -> sort value, higher first (must cover every item)
+            max_k: Most results a lookup can return
+        """
+        pairs = sorted(set(entries))
+        self._keys = [key for key, _ in pairs]
+        self._items = [item for _, item in pairs]
+        self._score = score
+        self.max_k = max_k
+        self._short: Dict[str, List[Hashable]] = {}
+        self._large: Dict[str, List[Hashable]] = {}
+        keys_of: Dict[Hashable, List[str]] = {}
+        for key, item in pairs:
+            keys_of.setdefault(item, []).append(key)
+        # Best items first, so each table entry fills up in ranked order
+        for item in sorted(keys_of, key=score.__getitem__, reverse=True):
+            for key in keys_of[item]:
+                for n in range(1, min(self.SHORT, len(key)) + 1):
+                    best = self._short.setdefault(key[:n], [])
+                    # An item's keys are handled together, so a repeat is always the last entry
+                    if len(best) < max_k and (not best or best[-1] != item):
+                        best.append(item)
+
+    def lookup(self, prefix: str, k: int) -> List[Hashable]:
+        """
+        The top `k` items (at most max_k) with a key starting with `prefix`.
+
+        Args:
+            prefix: Normalized prefix
+            k: Number of results wanted
+
+        Returns:
+            Items, best score first
+        """
+        k = min(k, self.max_k)
+        if len(prefix) <= self.SHORT:
+            return self._short.get(prefix, [])[:k]
+        best = self._large.get(prefix)
+        if best is not None:
+            return best[:k]
+        lo = bisect_left(self._keys, prefix)
+        hi = bisect_left(self._keys, prefix + _KEY_END, lo)
+        if hi - lo <= self.LARGE_RUN:
+            return nlargest(k, set(self._items[lo:hi]), key=self._score.__getitem__)
+        best = nlargest(self.max_k, set(self._items[lo:hi]), key=self._score.__getitem__)
+        self._large[prefix] = best
+        return best[:k]
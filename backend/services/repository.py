@@ -0,0 +1,302 @@
+import copy
+import os
+import threading
+from abc import ABC, abstractmethod
+from contextlib import nullcontext
+from pathlib import Path
+from typing import Any, ContextManager, Dict, Hashable, List, Optional
+
+from services import serializers
+from services.file_lock import FileLock
+from services.serializers import Serializer
+
+
+DEFAULT_DATA_DIR = Path(__file__).parent.parent / "data"
+
+# Collection name -> columns the SQLite backend indexes. A tuple is a
+# composite index.
+COLLECTIONS: Dict[str, List[tuple]] = {
+    "bookings": [("user_id",), ("movie_id", "showtime")],
+    "users": [("email",), ("username",)],
+    "phone_users": [("phone_number",)],
+    "movies": [],
+}
+
+BACKENDS = ("json", "journal", "sqlite")
+
+
+class Repository(ABC):
+    """
+    Record store for one collection of dicts keyed by their "id".
+
+    Whole-file backends need every record to write one, so write methods
+    take the caller's full, already-mutated list when it has one; row-level
+    backends ignore it.
+
+    Several processes may share one store. A caller that reads, decides
+    and then writes holds lock() across all three steps.
+    """
+
+    @abstractmethod
+    def load_all(self) -> List[Dict[str, Any]]:
+        """Every record, in insertion order."""
+
+    @abstractmethod
+    def put(self, record: Dict[str, Any],
+            records: Optional[List[Dict[str, Any]]] = None, op: str = "put") -> None:
+        """
+        Insert or replace one record.
+
+        Args:
+            record: The record as it should now be stored
+            records: Full list already containing `record`, if the caller has it
+            op: What kind of mutation this is (only recorded by journaling backends)
+        """
+
+    def put_many(self, changed: List[Dict[str, Any]],
+                 records: Optional[List[Dict[str, Any]]] = None, op: str = "put") -> None:
+        """
+        Insert or replace several records in one write: either all of them
+        are stored or none are. Arguments as for put().
+        """
+        for record in changed:
+            self.put(record, records, op=op)
+
+    @abstractmethod
+    def replace_all(self, records: List[Dict[str, Any]]) -> None:
+        """Overwrite the whole collection."""
+
+    @abstractmethod
+    def stamp(self) -> Hashable:
+        """Cheap value that changes whenever the stored data changes."""
+
+    def size_bytes(self) -> int:
+        """Bytes the collection occupies on disk (0 if unknown)."""
+        return 0
+
+    def vacuum(self) -> None:
+        """Give space freed by deleted records back to the filesystem."""
+
+    def sync(self) -> None:
+        """Force written data to stable storage (fsync); no-op where the backend does its own."""
+
+    def lock(self) -> ContextManager:
+        """Exclusive lock against writers in this and other processes (re-entrant)."""
+        return nullcontext()
+
+    def find_by(self, field: str, value: Any) -> List[Dict[str, Any]]:
+        """Records whose `field` equals `value`."""
+        return [r for r in self.load_all() if r.get(field) == value]
+
+    def find_one(self, field: str, value: Any) -> Optional[Dict[str, Any]]:
+        """First record whose `field` equals `value`, or None."""
+        matches = self.find_by(field, value)
+        return matches[0] if matches else None
+
+
+def file_stamp(path: Path) -> Optional[tuple]:
+    """(mtime, size, inode) of a file, or None if it does not exist."""
+    try:
+        st = path.stat()
+    except FileNotFoundError:
+        return None
+    return (st.st_mtime_ns, st.st_size, st.st_ino)
+
+
+def fsync_file(path: Path) -> None:
+    """fsync a file's contents, if it exists."""
+    try:
+        fd = os.open(path, os.O_RDONLY)
+    except FileNotFoundError:
+        return
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+def atomic_write(path: Path, data: bytes) -> None:
+    """Replace a file's contents so readers see either the old or the new file, never a mix."""
+    tmp = path.with_name(f".{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+    try:
+        with open(tmp, "wb") as f:
+            f.write(data)
+        os.replace(tmp, path)
+    except BaseException:
+        tmp.unlink(missing_ok=True)
+        raise
+
+
+def file_size(path: Path) -> int:
+    """Size of a file in bytes, or 0 if it does not exist."""
+    try:
+        return path.stat().st_size
+    except FileNotFoundError:
+        return 0
+
+
+class JsonRepository(Repository):
+    """
+    A collection stored as one array in a single file.
+
+    The file is written with `serializer` (pretty JSON unless configured,
+    see services/serializers.py) and read in whatever format it holds.
+
+    Safe to share between processes: writes go to a temporary file that is
+    renamed over the original, so readers always see a whole file, and
+    read-modify-write happens under an flock on "<file>.lock". Lookups by
+    field are served from a parsed copy that is only refreshed when the
+    file's (mtime, size, inode) changes, i.e. after some process wrote it.
+    """
+
+    def __init__(self, path: Path, serializer: Optional[Serializer] = None):
+        self.path = Path(path)
+        self.serializer = serializer or serializers.get_serializer("pretty")
+        self._file_lock = FileLock.for_path(self.path.with_name(self.path.name + ".lock"))
+        # find_by cache: field -> value -> records, valid while the stamp is unchanged
+        self._cache_lock = threading.Lock()
+        self._cache_stamp: Optional[tuple] = None
+        self._cached: List[Dict[str, Any]] = []
+        self._field_index: Dict[str, Dict[Any, List[Dict[str, Any]]]] = {}
+        with self.lock():
+            self._ensure_file()
+
+    def _ensure_file(self) -> None:
+        """Make sure the file exists and holds a list (migrate {} -> [])."""
+        if not self.path.exists():
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self.replace_all([])
+            return
+        try:
+            data = serializers.loads(self.path.read_bytes())
+        except ValueError:
+            return
+        if not isinstance(data, list):
+            self.replace_all([])
+
+    def load_all(self) -> List[Dict[str, Any]]:
+        try:
+            return self.records_from(self.path.read_bytes())
+        except FileNotFoundError:
+            return []
+
+    @staticmethod
+    def records_from(data: bytes) -> List[Dict[str, Any]]:
+        """Parse a file's contents as load_all() does (an unreadable file is empty)."""
+        try:
+            records = serializers.loads(data)
+        except ValueError:
+            return []
+        return records if isinstance(records, list) else []
+
+    def find_by(self, field: str, value: Any) -> List[Dict[str, Any]]:
+        with self._cache_lock:
+            stamp = self.stamp()
+            if stamp != self._cache_stamp:
+                # Stamp first: a write that lands mid-read shows up as a changed stamp next time
+                self._cached = self.load_all()
+                self._field_index = {}
+                self._cache_stamp = stamp
+            index = self._field_index.get(field)
+            if index is None:
+                index = {}
+                for record in self._cached:
+                    try:
+                        index.setdefault(record.get(field), []).append(record)
+                    except TypeError:  # unhashable value
+                        continue
+                self._field_index[field] = index
+            try:
+                matches = index.get(value, [])
+            except TypeError:
+                matches = [r for r in self._cached if r.get(field) == value]
+        # Callers may modify what they get; the cache must not change with it.
+        return copy.deepcopy(matches)
+
+    def put(self, record: Dict[str, Any],
+            records: Optional[List[Dict[str, Any]]] = None, op: str = "put") -> None:
+        self.put_many([record], records, op=op)
+
+    def put_many(self, changed: List[Dict[str, Any]],
+                 records: Optional[List[Dict[str, Any]]] = None, op: str = "put") -> None:
+        if records is not None:
+            self.replace_all(records)
+            return
+        # Upsert into what is on disk now, not a possibly stale copy.
+        with self.lock():
+            records = self.load_all()
+            position = {r.get("id"): i for i, r in enumerate(records)}
+            for record in changed:
+                if record["id"] in position:
+                    records[position[record["id"]]] = record
+                else:
+                    position[record["id"]] = len(records)
+                    records.append(record)
+            self.replace_all(records)
+
+    def replace_all(self, records: List[Dict[str, Any]]) -> None:
+        atomic_write(self.path, self.serializer.dumps(records))
+
+    def lock(self) -> ContextManager:
+        return self._file_lock
+
+    def stamp(self) -> Hashable:
+        return file_stamp(self.path)
+
+    def size_bytes(self) -> int:
+        return file_size(self.path)
+
+    def sync(self) -> None:
+        fsync_file(self.path)
+
+
+def storage_backend(collection: str, backend: Optional[str] = None) -> str:
+    """
+    Resolve which backend a collection uses.
+
+    STORAGE_BACKEND sets the default for every collection ("json" unless
+    set); <COLLECTION>_STORAGE, e.g. BOOKINGS_STORAGE, overrides it.
+    """
+    name = (backend
+            or os.getenv(f"{collection.upper()}_STORAGE")
+            or os.getenv("STORAGE_BACKEND", "json")).lower()
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown storage backend for {collection}: {name}")
+    if name == "journal" and collection != "bookings":
+        raise ValueError("Journal storage is only available for bookings")
+    return name
+
+
+def sqlite_path(data_dir: Optional[Path] = None) -> Path:
+    """Database file for the SQLite backend (SQLITE_PATH, else data/talknbook.db)."""
+    if os.getenv("SQLITE_PATH"):
+        return Path(os.environ["SQLITE_PATH"])
+    return Path(data_dir or DEFAULT_DATA_DIR) / "talknbook.db"
+
+
+def get_repository(collection: str, data_dir: Optional[Path] = None,
+                   backend: Optional[str] = None) -> Repository:
+    """
+    Build the repository for a collection according to configuration.
+
+    Args:
+        collection: One of COLLECTIONS
+        data_dir: Directory holding the data files (defaults to backend/data)
+        backend: Force a backend instead of reading the environment
+
+    Returns:
+        A Repository instance
+    """
+    if collection not in COLLECTIONS:
+        raise ValueError(f"Unknown collection: {collection}")
+    data_dir = Path(data_dir or DEFAULT_DATA_DIR)
+    name = storage_backend(collection, backend)
+    if name == "sqlite":
+        from services.sqlite_repository import SqliteRepository
+        return SqliteRepository(sqlite_path(data_dir), collection, COLLECTIONS[collection])
+    serializer = serializers.get_serializer(serializers.data_format(collection))
+    json_repo = JsonRepository(data_dir / f"{collection}.json", serializer)
+    if name == "journal":
+        from services.booking_journal import BookingJournal
+        return BookingJournal(data_dir / f"{collection}.journal", json_repo)
+    return json_repo
@@ -0,0 +1,172 @@
+import heapq
+import time
+import uuid
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from services.seat_map import mask_to_seats
+
+
+DEFAULT_HOLD_TTL = 120
+MAX_HOLD_TTL = 600
+
+ShowingKey = Tuple[str, str]
+
+
+class SeatHoldManager:
+    """
+    Temporary seat reservations that lapse after a TTL.
+
+    Holds live in memory (like pending OTPs; swap for Redis in prod). Each
+    showing keeps the OR of its holds' seat masks, and holds on one showing
+    never overlap, so "is this seat held?" is a single AND. Expiry times sit
+    in a min-heap that is swept lazily on every access: only lapsed entries
+    are popped, so a sweep costs O(k log n) for k expired holds.
+
+    Not thread-safe on its own — BookingService calls it under its locks.
+    """
+
+    def __init__(self, clock: Callable[[], float] = time.monotonic):
+        self._clock = clock
+        self._holds: Dict[str, Dict[str, Any]] = {}
+        self._by_showing: Dict[ShowingKey, Dict[str, Dict[str, Any]]] = {}
+        self._held: Dict[ShowingKey, int] = {}
+        # (expires_at, hold_id); entries for released holds are skipped when popped.
+        self._expiry: List[Tuple[float, str]] = []
+
+    def sweep(self) -> List[Dict[str, Any]]:
+        """Drop every hold whose TTL has passed and return them."""
+        now = self._clock()
+        expired = []
+        while self._expiry and self._expiry[0][0] <= now:
+            expires_at, hold_id = heapq.heappop(self._expiry)
+            hold = self._holds.get(hold_id)
+            if hold is not None and hold["expires_at"] == expires_at:
+                self._drop(hold)
+                expired.append(hold)
+        return expired
+
+    def _drop(self, hold: Dict[str, Any]) -> None:
+        key = hold["key"]
+        del self._holds[hold["id"]]
+        showing = self._by_showing[key]
+        del showing[hold["id"]]
+        if showing:
+            self._held[key] &= ~hold["mask"]
+        else:
+            del self._by_showing[key]
+            del self._held[key]
+
+    def held_mask(self, key: ShowingKey, exclude_user: Optional[str] = None) -> int:
+        """
+        Seats held on a showing.
+
+        Args:
+            key: (movie_id, showtime)
+            exclude_user: Leave out this user's own holds
+
+        Returns:
+            Seat bitmask
+        """
+        self.sweep()
+        held = self._held.get(key, 0)
+        if exclude_user is not None and held:
+            for hold in self._by_showing[key].values():
+                if hold["user_id"] == exclude_user:
+                    held &= ~hold["mask"]
+        return held
+
+    def place(self, key: ShowingKey, mask: int, user_id: str, occupied: int,
+              ttl_seconds: Optional[float] = None, details: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """
+        Hold seats for a user.
+
+        Args:
+            key: (movie_id, showtime)
+            mask: Seats to hold
+            user_id: Who is holding them
+            occupied: Seats already booked on the showing
+            ttl_seconds: Lifetime of the hold (DEFAULT_HOLD_TTL if omitted)
+            details: Extra fields stored on the hold (e.g. title and price)
+
+        Returns:
+            The hold record
+
+        Raises:
+            ValueError: If any seat is booked or held by someone else
+        """
+        ttl = DEFAULT_HOLD_TTL if ttl_seconds is None else ttl_seconds
+        if ttl <= 0 or ttl > MAX_HOLD_TTL:
+            raise ValueError(f"Hold TTL must be between 1 and {MAX_HOLD_TTL} seconds")
+        if not mask:
+            raise ValueError("No seats to hold")
+        booked = mask & occupied
+        if booked:
+            raise ValueError(f"Seats {mask_to_seats(booked)} are already booked")
+        held = mask & self.held_mask(key, exclude_user=user_id)
+        if held:
+            raise ValueError(f"Seats {mask_to_seats(held)} are currently held by another customer")
+        # Re-holding your own seats moves them to the new hold.
+        self.release_seats(key, user_id, mask)
+
+        hold = dict(details or {})
+        hold.update({
+            "id": str(uuid.uuid4()),
+            "key": key,
+            "user_id": user_id,
+            "mask": mask,
+            "expires_at": self._clock() + ttl,
+        })
+        self._holds[hold["id"]] = hold
+        self._by_showing.setdefault(key, {})[hold["id"]] = hold
+        self._held[key] = self._held.get(key, 0) | mask
+        heapq.heappush(self._expiry, (hold["expires_at"], hold["id"]))
+        return hold
+
+    def get(self, hold_id: str) -> Optional[Dict[str, Any]]:
+        """The live hold with this id, or None if it never existed or lapsed."""
+        self.sweep()
+        return self._holds.get(hold_id)
+
+    def release(self, hold_id: str) -> Optional[Dict[str, Any]]:
+        """Remove a hold and return it (None if it was not live)."""
+        hold = self.get(hold_id)
+        if hold is not None:
+            self._drop(hold)
+        return hold
+
+    def release_seats(self, key: ShowingKey, user_id: str, mask: int) -> None:
+        """Take `mask` out of every hold `user_id` has on a showing."""
+        self.sweep()
+        for hold in list(self._by_showing.get(key, {}).values()):
+            if hold["user_id"] != user_id or not hold["mask"] & mask:
+                continue
+            remaining = hold["mask"] & ~mask
+            if remaining:
+                self._held[key] &= ~(hold["mask"] & mask)
+                hold["mask"] = remaining
+            else:
+                self._drop(hold)
+
+    def extend(self, key: ShowingKey, user_id: str, mask: int, ttl_seconds: Optional[float] = None) -> int:
+        """
+        Restart the TTL of every hold `user_id` has on a showing that covers any of `mask`.
+
+        Returns:
+            The seats of `mask` the user still holds (lapsed ones are gone)
+        """
+        self.sweep()
+        ttl = DEFAULT_HOLD_TTL if ttl_seconds is None else min(ttl_seconds, MAX_HOLD_TTL)
+        expires_at = self._clock() + ttl
+        still_held = 0
+        for hold in self._by_showing.get(key, {}).values():
+            if hold["user_id"] != user_id or not hold["mask"] & mask:
+                continue
+            still_held |= hold["mask"] & mask
+            if expires_at > hold["expires_at"]:
+                # The old heap entry no longer matches and is skipped when popped
+                hold["expires_at"] = expires_at
+                heapq.heappush(self._expiry, (expires_at, hold["id"]))
+        return still_held
+
+    def seconds_left(self, hold: Dict[str, Any]) -> float:
+        return max(0.0, hold["expires_at"] - self._clock())
@@ -0,0 +1,77 @@
+"""
+Bitset representation of an auditorium's seats.
+
+Every showing uses the same fixed grid, so a showing's occupancy fits in one
+int: seat "B3" is bit `row_index * SEATS_PER_ROW + (number - 1)`. Conflict
+checks are `requested & occupied`, booking is `occupied | requested` and
+availability is a popcount. Seat-ID strings only exist at the API edge.
+"""
+from typing import Dict, Iterable, List, Set, Tuple
+
+
+# Matches the seat map rendered by frontend/src/pages/Booking.jsx.
+SEAT_ROWS = "ABCDEF"
+SEATS_PER_ROW = 10
+
+SEAT_COUNT = len(SEAT_ROWS) * SEATS_PER_ROW
+FULL_MASK = (1 << SEAT_COUNT) - 1
+
+ALL_SEATS: List[str] = [f"{row}{n}" for row in SEAT_ROWS for n in range(1, SEATS_PER_ROW + 1)]
+_BIT_BY_SEAT: Dict[str, int] = {seat: i for i, seat in enumerate(ALL_SEATS)}
+
+
+def seats_to_mask(seats: Iterable[str]) -> int:
+    """
+    Encode seat IDs as a bitmask.
+
+    Args:
+        seats: Seat IDs like "A1"
+
+    Returns:
+        Bitmask with one bit set per seat
+
+    Raises:
+        ValueError: If any seat is not on the grid
+    """
+    mask, invalid = split_seats(seats)
+    if invalid:
+        raise ValueError(f"Seats {sorted(invalid)} do not exist")
+    return mask
+
+
+def split_seats(seats: Iterable[str]) -> Tuple[int, Set[str]]:
+    """
+    Lenient variant of seats_to_mask for data already on disk.
+
+    Returns:
+        (mask of on-grid seats, set of seat IDs that are not on the grid)
+    """
+    mask = 0
+    invalid: Set[str] = set()
+    for seat in seats:
+        bit = _BIT_BY_SEAT.get(seat)
+        if bit is None:
+            invalid.add(seat)
+        else:
+            mask |= 1 << bit
+    return mask, invalid
+
+
+def mask_to_seats(mask: int) -> List[str]:
+    """Decode a bitmask into seat IDs in grid order."""
+    seats = []
+    while mask:
+        low = mask & -mask
+        seats.append(ALL_SEATS[low.bit_length() - 1])
+        mask ^= low
+    return seats
+
+
+def seat_count(mask: int) -> int:
+    """Number of seats set in a mask."""
+    return mask.bit_count()
+
+
+def free_count(occupied: int) -> int:
+    """Number of seats still open given an occupancy mask."""
+    return SEAT_COUNT - seat_count(occupied & FULL_MASK)
@@ -0,0 +1,138 @@
+"""
+On-disk encodings for the whole-file stores (users.json, movies.json, ...).
+
+  - "pretty":  indented JSON, the historical format; easy to read and diff
+  - "compact": JSON without whitespace; smaller and faster to write
+  - "msgpack": MessagePack (needs `pip install msgpack`); smallest, fastest
+
+Loading never needs to be told the format: JSON always starts with "[" or
+"{" (after optional whitespace) while a MessagePack array starts with a
+binary type byte, so files can be switched between formats in place.
+"""
+
+import gc
+import json
+import os
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, Optional
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+
+class Serializer:
+    """Encodes a collection (list of dicts) to bytes and back."""
+
+    name = ""
+
+    def dumps(self, records: Any) -> bytes:
+        raise NotImplementedError
+
+    def loads(self, data: bytes) -> Any:
+        raise NotImplementedError
+
+
+class PrettyJsonSerializer(Serializer):
+    name = "pretty"
+
+    def dumps(self, records: Any) -> bytes:
+        return json.dumps(records, indent=2, default=str).encode()
+
+    def loads(self, data: bytes) -> Any:
+        return json.loads(data)
+
+
+class CompactJsonSerializer(Serializer):
+    name = "compact"
+
+    def dumps(self, records: Any) -> bytes:
+        return json.dumps(records, separators=(",", ":"), default=str).encode()
+
+    def loads(self, data: bytes) -> Any:
+        return json.loads(data)
+
+
+class MsgpackSerializer(Serializer):
+    name = "msgpack"
+
+    def __init__(self):
+        if msgpack is None:
+            raise RuntimeError("The msgpack format needs the msgpack package (pip install msgpack)")
+
+    def dumps(self, records: Any) -> bytes:
+        return msgpack.packb(records, default=str, use_bin_type=True)
+
+    def loads(self, data: bytes) -> Any:
+        return msgpack.unpackb(data, raw=False)
+
+
+SERIALIZERS = {
+    "pretty": PrettyJsonSerializer,
+    "compact": CompactJsonSerializer,
+    "msgpack": MsgpackSerializer,
+}
+
+_instances: Dict[str, Serializer] = {}
+
+
+def get_serializer(name: str) -> Serializer:
+    """Serializer by name (one of SERIALIZERS)."""
+    name = name.lower()
+    if name not in SERIALIZERS:
+        raise ValueError(f"Unknown data format: {name}")
+    if name not in _instances:
+        _instances[name] = SERIALIZERS[name]()
+    return _instances[name]
+
+
+def detect_format(data: bytes) -> str:
+    """Name of the format `data` is in."""
+    head = data[:4096].lstrip()
+    if head[:1] and head[:1] not in b"[{":
+        return "msgpack"
+    # Both JSON flavours parse the same; only the line breaks tell them apart.
+    return "pretty" if b"\n" in head.rstrip() else "compact"
+
+
+@contextmanager
+def paused_gc() -> Iterator[None]:
+    """
+    Suspend the cyclic GC while building many acyclic containers.
+
+    Every few hundred allocations the collector would otherwise rescan the
+    whole young heap, which makes loading a big collection superlinear.
+    """
+    gc_was_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        yield
+    finally:
+        if gc_was_enabled:
+            gc.enable()
+
+
+def loads(data: bytes) -> Any:
+    """Decode a data file in whichever format it was written."""
+    if not data[:4096].strip():
+        return []
+    serializer = get_serializer(detect_format(data))
+    # Decoding allocates a container per record and none of them form cycles.
+    with paused_gc():
+        return serializer.loads(data)
+
+
+def data_format(collection: str, name: Optional[str] = None) -> str:
+    """
+    Resolve which format a collection is written in.
+
+    DATA_FORMAT sets the default ("pretty" unless set); <COLLECTION>_FORMAT,
+    e.g. BOOKINGS_FORMAT, overrides it.
+    """
+    name = (name
+            or os.getenv(f"{collection.upper()}_FORMAT")
+            or os.getenv("DATA_FORMAT", "pretty")).lower()
+    if name not in SERIALIZERS:
+        raise ValueError(f"Unknown data format for {collection}: {name}")
+    return name
@@ -0,0 +1,136 @@
+import json
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Any, ContextManager, Dict, Hashable, List, Optional, Sequence
+
+from services.file_lock import FileLock
+from services.repository import Repository, file_size
+
+
+class SqliteRepository(Repository):
+    """
+    A collection stored as rows of a table in a single SQLite file.
+
+    Each row keeps the full record as JSON in `data`, plus a copy of the
+    configured fields in their own indexed columns so lookups by them do
+    not touch other rows. The database runs in WAL mode so readers never
+    block the writer.
+
+    Collections share one file, so the change stamp is a per-collection
+    counter in the `meta` table, bumped in the same transaction as every
+    write: a booking does not look like a catalog change, nor a signup
+    like a booking.
+    """
+
+    def __init__(self, db_path: Path, table: str, indexes: Sequence[tuple] = ()):
+        self.db_path = Path(db_path)
+        self.table = table
+        self.indexes = [tuple(ix) for ix in indexes]
+        self.columns: List[str] = []
+        for ix in self.indexes:
+            for col in ix:
+                if col not in self.columns:
+                    self.columns.append(col)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        # One connection per repository, shared across threads under a lock.
+        self._conn = sqlite3.connect(str(self.db_path), check_same_thread=False,
+                                     isolation_level=None)
+        self._lock = threading.Lock()
+        # Transactions keep single writes atomic; this serializes callers'
+        # read-decide-write sequences across processes.
+        self._file_lock = FileLock.for_path(Path(f"{self.db_path}.lock"))
+        self._create_schema()
+
+    def _create_schema(self) -> None:
+        cols = "".join(f", {c} TEXT" for c in self.columns)
+        with self._lock:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.execute(
+                f"CREATE TABLE IF NOT EXISTS {self.table} "
+                f"(id TEXT PRIMARY KEY, data TEXT NOT NULL{cols})"
+            )
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS meta "
+                "(collection TEXT PRIMARY KEY, version INTEGER NOT NULL)"
+            )
+            self._conn.execute(
+                "INSERT OR IGNORE INTO meta (collection, version) VALUES (?, 0)", (self.table,)
+            )
+            for ix in self.indexes:
+                name = f"ix_{self.table}_{'_'.join(ix)}"
+                self._conn.execute(
+                    f"CREATE INDEX IF NOT EXISTS {name} ON {self.table} ({', '.join(ix)})"
+                )
+
+    def _row(self, record: Dict[str, Any]) -> tuple:
+        data = json.dumps(record, separators=(",", ":"), default=str)
+        return (record["id"], data, *(record.get(c) for c in self.columns))
+
+    def _upsert_sql(self) -> str:
+        names = ["id", "data", *self.columns]
+        updates = ", ".join(f"{n} = excluded.{n}" for n in names[1:])
+        return (f"INSERT INTO {self.table} ({', '.join(names)}) "
+                f"VALUES ({', '.join('?' for _ in names)}) "
+                f"ON CONFLICT(id) DO UPDATE SET {updates}")
+
+    def load_all(self) -> List[Dict[str, Any]]:
+        with self._lock:
+            rows = self._conn.execute(f"SELECT data FROM {self.table} ORDER BY rowid").fetchall()
+        return [json.loads(data) for (data,) in rows]
+
+    def find_by(self, field: str, value: Any) -> List[Dict[str, Any]]:
+        if field != "id" and field not in self.columns:
+            return super().find_by(field, value)
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT data FROM {self.table} WHERE {field} = ? ORDER BY rowid", (value,)
+            ).fetchall()
+        return [json.loads(data) for (data,) in rows]
+
+    def put(self, record: Dict[str, Any],
+            records: Optional[List[Dict[str, Any]]] = None, op: str = "put") -> None:
+        self._transaction(delete_all=False, records=[record])
+
+    def put_many(self, changed: List[Dict[str, Any]],
+                 records: Optional[List[Dict[str, Any]]] = None, op: str = "put") -> None:
+        self._transaction(delete_all=False, records=changed)
+
+    def replace_all(self, records: List[Dict[str, Any]]) -> None:
+        self._transaction(delete_all=True, records=records)
+
+    def _transaction(self, delete_all: bool, records: List[Dict[str, Any]]) -> None:
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                if delete_all:
+                    self._conn.execute(f"DELETE FROM {self.table}")
+                self._conn.executemany(self._upsert_sql(), [self._row(r) for r in records])
+                self._conn.execute(
+                    "UPDATE meta SET version = version + 1 WHERE collection = ?", (self.table,)
+                )
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+            self._conn.execute("COMMIT")
+
+    def size_bytes(self) -> int:
+        # The whole database file: tables share pages, so this is an upper bound.
+        return sum(file_size(Path(f"{self.db_path}{suffix}")) for suffix in ("", "-wal"))
+
+    def vacuum(self) -> None:
+        with self._lock:
+            self._conn.execute("VACUUM")
+            # VACUUM itself goes through the WAL; fold it back into the main file.
+            self._conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+
+    def lock(self) -> ContextManager:
+        return self._file_lock
+
+    def stamp(self) -> Hashable:
+        with self._lock:
+            (version,) = self._conn.execute(
+                "SELECT version FROM meta WHERE collection = ?", (self.table,)
+            ).fetchone()
+            return version
@@ -0,0 +1,189 @@
+"""
+Concurrency stress test for BookingService.
+
+Hundreds of concurrent clients race for overlapping seats across a few
+showings; afterwards every showing must have each seat in at most one
+confirmed booking, both in memory and after reloading from disk.
+
+A second round splits the clients over several processes sharing one
+data directory, each also re-reading the store in a loop, the way several
+uvicorn workers do; a round that does not finish in time is reported as
+a deadlock.
+Run from backend/: python stress_test_bookings.py [--clients 400] [--storage json] [--processes 4]
+"""
+import argparse
+import multiprocessing
+import os
+import queue
+import random
+import sys
+import tempfile
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from models.booking import BookingCreate
+from services.booking_service import BookingService
+from services.seat_map import ALL_SEATS
+
+SHOWINGS = [("movie-1", "7:00 PM"), ("movie-1", "10:00 PM"), ("movie-2", "7:00 PM")]
+# A small pool of hot seats so most clients collide.
+HOT_SEATS = ALL_SEATS[:12]
+# Client threads running at once
+WORKERS = 200
+# Seconds a multi-process round may take before it counts as deadlocked
+PROCESS_TIMEOUT = 60
+
+
+def _double_booked(service: BookingService) -> dict:
+    """showing -> seats that appear in more than one confirmed booking."""
+    problems = {}
+    for movie_id, showtime in SHOWINGS:
+        counts = Counter(
+            seat
+            for b in service._load_bookings()
+            if b["status"] == "confirmed" and b["movie_id"] == movie_id and b["showtime"] == showtime
+            for seat in b["seats"]
+        )
+        dupes = sorted(seat for seat, n in counts.items() if n > 1)
+        if dupes:
+            problems[(movie_id, showtime)] = dupes
+    return problems
+
+
+def _plans(clients: int, seed: int, first: int = 0) -> list:
+    rng = random.Random(seed)
+    plans = []
+    for i in range(first, first + clients):
+        movie_id, showtime = rng.choice(SHOWINGS)
+        seats = rng.sample(HOT_SEATS, rng.randint(1, 3))
+        plans.append((f"user-{i}", movie_id, showtime, seats))
+    return plans
+
+
+def _race(service: BookingService, plans: list, go, release: bool = False) -> Counter:
+    """
+    Run every plan as a client once `go` is set (here, with `release`).
+
+    Every client is queued before any starts; WORKERS of them then run at once.
+    """
+    def client(plan):
+        user_id, movie_id, showtime, seats = plan
+        go.wait()
+        try:
+            service.create_booking(
+                BookingCreate(movie_id=movie_id, movie_title=movie_id, showtime=showtime,
+                              seats=seats, total_price=10.0 * len(seats)),
+                user_id,
+            )
+            return "booked"
+        except ValueError:
+            return "conflict"
+
+    with ThreadPoolExecutor(max_workers=min(len(plans), WORKERS)) as pool:
+        futures = [pool.submit(client, plan) for plan in plans]
+        if release:
+            go.set()
+        return Counter(future.result() for future in futures)
+
+
+def _report(label: str, data_dir: str, storage: str, outcome: Counter, elapsed: float,
+            service: Optional[BookingService] = None) -> bool:
+    in_memory = _double_booked(service) if service else {}
+    on_disk = _double_booked(BookingService(data_dir, storage))
+    ok = not in_memory and not on_disk
+    print(f"[{label}] {sum(outcome.values())} clients in {elapsed:.2f}s: "
+          f"{outcome['booked']} booked, {outcome['conflict']} rejected -> "
+          f"{'OK, zero double-bookings' if ok else 'FAIL'}")
+    for where, problems in (("memory", in_memory), ("disk", on_disk)):
+        for showing, seats in problems.items():
+            print(f"  double-booked ({where}) {showing}: {seats}")
+    return ok
+
+
+def run(storage: str, clients: int, seed: int) -> bool:
+    data_dir = tempfile.mkdtemp(prefix=f"stress-{storage}-")
+    service = BookingService(data_dir, storage)
+    plans = _plans(clients, seed)
+    t0 = time.perf_counter()
+    outcome = _race(service, plans, threading.Event(), release=True)
+    elapsed = time.perf_counter() - t0
+    return _report(storage, data_dir, storage, outcome, elapsed, service)
+
+
+def _worker(data_dir: str, storage: str, plans: list, go, results) -> None:
+    """One process's share of the clients, plus a reader that keeps reloading the store."""
+    service = BookingService(data_dir, storage)
+    done = threading.Event()
+
+    def reader():
+        go.wait()
+        while not done.is_set():
+            for movie_id, showtime in SHOWINGS:
+                service.get_occupancy_mask(movie_id, showtime)
+
+    threading.Thread(target=reader, daemon=True).start()
+    outcome = _race(service, plans, go)
+    done.set()
+    results.put(dict(outcome))
+
+
+def run_processes(storage: str, clients: int, seed: int, processes: int) -> bool:
+    data_dir = tempfile.mkdtemp(prefix=f"stress-{storage}-mp-")
+    BookingService(data_dir, storage)
+    label = f"{storage} x{processes} processes"
+    ctx = multiprocessing.get_context("spawn")
+    go = ctx.Event()
+    results = ctx.Queue()
+    share = clients // processes
+    workers = [
+        ctx.Process(target=_worker,
+                    args=(data_dir, storage, _plans(share, seed + p, p * share), go, results))
+        for p in range(processes)
+    ]
+    for worker in workers:
+        worker.start()
+    # Give every process time to build its service before the race starts
+    time.sleep(2)
+    t0 = time.perf_counter()
+    go.set()
+    outcomes = []
+    try:
+        for _ in workers:
+            outcomes.append(results.get(timeout=max(0.0, t0 + PROCESS_TIMEOUT - time.perf_counter())))
+    except queue.Empty:
+        pass
+    elapsed = time.perf_counter() - t0
+    for worker in workers:
+        worker.join(1)
+        if worker.is_alive():
+            worker.kill()
+    if len(outcomes) < processes:
+        print(f"[{label}] {processes - len(outcomes)} of {processes} processes still running "
+              f"after {PROCESS_TIMEOUT}s -> FAIL, deadlocked")
+        return False
+    return _report(label, data_dir, storage, sum(map(Counter, outcomes), Counter()), elapsed)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="BookingService concurrency stress test")
+    parser.add_argument("--clients", type=int, default=400)
+    parser.add_argument("--storage", choices=["json", "journal", "sqlite", "all"], default="all")
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--processes", type=int, default=4,
+                        help="processes for the multi-process round (0 skips it)")
+    args = parser.parse_args()
+
+    storages = ["json", "journal", "sqlite"] if args.storage == "all" else [args.storage]
+    results = [run(storage, args.clients, args.seed) for storage in storages]
+    if args.processes > 0:
+        results += [run_processes(storage, args.clients, args.seed, args.processes) for storage in storages]
+    return 0 if all(results) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -131,6 +131,7 @@ def _booking_instructions(wrapper: RunContextWrapper[VoiceContext], agent: Agent
         "- 'Tell me about X'                     -> `get_movie_details`.\n"
         "- 'Are seats available?'                -> `check_seat_availability`.\n"
         "- 'Book me N seats for X at TIME, pick good ones' -> `book_best_available`.\n"
+        "- Caller picks seats, not yet confirmed -> `hold_seats`, then ask them to confirm.\n"
         "- 'Book seats A1, A2 for X at TIME'    -> `book_specific_seats`.\n"
         "- 'What are my bookings?'              -> `list_my_bookings`.\n"
         "- 'Cancel seats X from my booking'     -> `cancel_specific_seats`.\n"
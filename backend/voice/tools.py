@@ -8,17 +8,18 @@ from agents import RunContextWrapper, function_tool
 # of a uvicorn launch (e.g. when running cli.py directly).
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from models.booking import BookingCreate
-from services.booking_service import BookingService
-from services.movie_service import MovieService
+from models.booking import BookingCreate, SeatHoldCreate
+from services.booking_service import get_booking_service
+from services.movie_service import get_movie_service
 from services.phone_auth_service import PhoneAuthService, normalize_phone
+from services.seat_map import FULL_MASK, SEAT_COUNT, free_count, mask_to_seats, seat_count
 
 from .context import VoiceContext
 
 # Service singletons — JSON-backed, so safe to share across requests.
 _phone_auth = PhoneAuthService()
-_movies = MovieService()
-_bookings = BookingService()
+_movies = get_movie_service()
+_bookings = get_booking_service()
 
 
 def get_phone_auth_service() -> PhoneAuthService:
@@ -26,26 +27,39 @@ def get_phone_auth_service() -> PhoneAuthService:
     return _phone_auth
 
 
-SEAT_ROWS = "ABCDEF"
-SEATS_PER_ROW = 8
-
-
-def _seat_grid() -> list[str]:
-    return [f"{row}{n}" for row in SEAT_ROWS for n in range(1, SEATS_PER_ROW + 1)]
+# Fuzzy title scores (0-1) at which a spoken title is taken as meaning that
+# movie, and at which a movie is still worth offering as "did you mean".
+MATCH_SCORE = 0.6
+SUGGEST_SCORE = 0.3
 
 
 def _find_movie(query: str) -> Optional[dict]:
-    """Best-effort movie lookup by id, substring of title, or genre."""
+    """
+    Best-effort movie lookup by id or substring of title, then by a fuzzy
+    title match (mishearings, "end game" for "Endgame"), then by genre.
+    """
     q = (query or "").strip().lower()
     if not q:
         return None
     for m in _movies.get_all_movies():
         if m["id"] == q or q in m["title"].lower():
             return m
+    matches = _movies.match_movies(q, limit=1, min_score=MATCH_SCORE)
+    if matches:
+        return matches[0][0]
     matches = _movies.search_movies(q)
     return matches[0] if matches else None
 
 
+def _no_movie(query: str) -> str:
+    """Reply for a title _find_movie couldn't place, naming the closest ones."""
+    msg = f"No movie matching '{query}'."
+    candidates = _movies.match_movies(query or "", limit=3, min_score=SUGGEST_SCORE)
+    if candidates:
+        msg += " Closest titles: " + ", ".join(m["title"] for m, _ in candidates) + "."
+    return msg
+
+
 def _find_user_booking(user_id: str, query: str) -> Optional[dict]:
     """Find a confirmed booking by movie title substring or short id."""
     q = (query or "").strip().lower()
@@ -156,7 +170,7 @@ def get_movie_details(ctx: RunContextWrapper[VoiceContext], movie_query: str) ->
     """Get full details for one movie (description, duration, showtimes, price)."""
     movie = _find_movie(movie_query)
     if not movie:
-        return f"No movie matching '{movie_query}'."
+        return _no_movie(movie_query)
     return (f"{movie['title']} ({movie['genre']}, {movie['duration']}, "
             f"rated {movie['rating']}). {movie['description']} "
             f"Showtimes: {', '.join(movie['showtimes'])}. "
@@ -169,15 +183,19 @@ def check_seat_availability(ctx: RunContextWrapper[VoiceContext],
     """How many seats are open for a given movie + showtime."""
     movie = _find_movie(movie_query)
     if not movie:
-        return f"No movie matching '{movie_query}'."
+        return _no_movie(movie_query)
     if showtime not in movie["showtimes"]:
         return (f"{movie['title']} doesn't have a {showtime} showing. "
                 f"Try one of: {', '.join(movie['showtimes'])}.")
-    booked = set(_bookings.get_booked_seats(movie["id"], showtime))
-    grid = _seat_grid()
-    available = [s for s in grid if s not in booked]
-    return (f"{movie['title']} at {showtime}: {len(available)} of {len(grid)} seats free. "
-            f"Sample available seats: {', '.join(available[:8])}.")
+    occupied = _bookings.get_occupancy_mask(movie["id"], showtime)
+    held = _bookings.get_held_mask(movie["id"], showtime) & ~occupied
+    taken = occupied | held
+    sample = mask_to_seats(FULL_MASK & ~taken)[:8]
+    msg = (f"{movie['title']} at {showtime}: {free_count(taken)} of {SEAT_COUNT} seats free. "
+           f"Sample available seats: {', '.join(sample)}.")
+    if held:
+        msg += f" {seat_count(held)} more are on hold for other customers and may free up."
+    return msg
 
 
 # =============================================================================
@@ -204,7 +222,7 @@ def book_specific_seats(ctx: RunContextWrapper[VoiceContext],
         return err
     movie = _find_movie(movie_query)
     if not movie:
-        return f"No movie matching '{movie_query}'."
+        return _no_movie(movie_query)
     if showtime not in movie["showtimes"]:
         return (f"{movie['title']} doesn't have a {showtime} showing. "
                 f"Try: {', '.join(movie['showtimes'])}.")
@@ -244,15 +262,15 @@ def book_best_available(ctx: RunContextWrapper[VoiceContext],
         return "Please book between 1 and 12 seats."
     movie = _find_movie(movie_query)
     if not movie:
-        return f"No movie matching '{movie_query}'."
+        return _no_movie(movie_query)
     if showtime not in movie["showtimes"]:
         return (f"{movie['title']} doesn't have a {showtime} showing. "
                 f"Try: {', '.join(movie['showtimes'])}.")
-    booked = set(_bookings.get_booked_seats(movie["id"], showtime))
-    available = [s for s in _seat_grid() if s not in booked]
-    if len(available) < num_seats:
-        return f"Only {len(available)} seats free for that showing."
-    chosen = available[:num_seats]
+    taken = (_bookings.get_occupancy_mask(movie["id"], showtime)
+             | _bookings.get_held_mask(movie["id"], showtime))
+    if free_count(taken) < num_seats:
+        return f"Only {free_count(taken)} seats free for that showing."
+    chosen = mask_to_seats(FULL_MASK & ~taken)[:num_seats]
     try:
         booking = _bookings.create_booking(
             BookingCreate(
@@ -271,6 +289,46 @@ def book_best_available(ctx: RunContextWrapper[VoiceContext],
             f"Booking reference: {booking['id'][:8]}.")
 
 
+@function_tool
+def hold_seats(ctx: RunContextWrapper[VoiceContext],
+               movie_query: str, showtime: str, seats: str) -> str:
+    """
+    Hold seats for two minutes while the caller confirms them.
+
+    Call this as soon as the caller picks seats, before asking them to
+    confirm; `book_specific_seats` then books them without a conflict.
+    `seats` is comma-separated like "A1,A2".
+    """
+    err = _require_auth(ctx)
+    if err:
+        return err
+    movie = _find_movie(movie_query)
+    if not movie:
+        return _no_movie(movie_query)
+    if showtime not in movie["showtimes"]:
+        return (f"{movie['title']} doesn't have a {showtime} showing. "
+                f"Try: {', '.join(movie['showtimes'])}.")
+    seat_list = [s.strip().upper() for s in seats.split(",") if s.strip()]
+    if not seat_list:
+        return "No seats specified."
+    try:
+        hold = _bookings.hold_seats(
+            SeatHoldCreate(
+                movie_id=movie["id"],
+                movie_title=movie["title"],
+                showtime=showtime,
+                seats=seat_list,
+                total_price=movie["price"] * len(seat_list),
+            ),
+            ctx.context.phone_user_id,
+        )
+    except ValueError as e:
+        return f"Couldn't hold those seats: {e}"
+    return (f"Holding {', '.join(hold['seats'])} for {hold['movie_title']} at {showtime} "
+            f"for {int(hold['expires_in'])} seconds. Total would be ${hold['total_price']:.2f}. "
+            f"Ask the caller to confirm, then call book_specific_seats.")
+
+
 @function_tool
 def list_my_bookings(ctx: RunContextWrapper[VoiceContext]) -> str:
     """Show the caller's confirmed bookings."""
@@ -302,7 +360,10 @@ def cancel_entire_booking(ctx: RunContextWrapper[VoiceContext],
     booking = _find_user_booking(ctx.context.phone_user_id, booking_query)
     if not booking:
         return f"No active booking matching '{booking_query}'."
-    ok = _bookings.cancel_booking(booking["id"], ctx.context.phone_user_id)
+    try:
+        ok = _bookings.cancel_booking(booking["id"], ctx.context.phone_user_id)
+    except ValueError as e:
+        return f"Couldn't cancel: {e}"
     if not ok:
         return "Couldn't cancel — that booking may already be cancelled."
     return f"Cancelled {booking['movie_title']} at {booking['showtime']} (ref {booking['id'][:8]})."
@@ -325,7 +386,10 @@ def cancel_specific_seats(ctx: RunContextWrapper[VoiceContext],
     seat_list = [s.strip().upper() for s in seats.split(",") if s.strip()]
     if not seat_list:
         return "No seats specified."
-    result = _bookings.cancel_seats(booking["id"], seat_list, ctx.context.phone_user_id)
+    try:
+        result = _bookings.cancel_seats(booking["id"], seat_list, ctx.context.phone_user_id)
+    except ValueError as e:
+        return f"Couldn't cancel: {e}"
     return result["message"]
 
 
@@ -334,6 +398,7 @@ AUTH_TOOLS = [send_phone_otp, verify_phone_otp, set_caller_name]
 INFO_TOOLS = [list_all_movies, search_movies, get_movie_details, check_seat_availability]
 
 BOOKING_TOOLS = [
+    hold_seats,
     book_specific_seats,
     book_best_available,
     list_my_bookings,
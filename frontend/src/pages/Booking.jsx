@@ -1,4 +1,4 @@
-import { useState, useEffect, useContext } from 'react';
+import { useState, useEffect, useContext, useRef } from 'react';
 import { useParams, useLocation, useNavigate } from 'react-router-dom';
 import Layout from '../components/layout/Layout';
 import { bookingsAPI, moviesAPI } from '../services/api';
@@ -13,6 +13,7 @@ const Booking = () => {
   const [movie, setMovie] = useState(location.state?.movie || null);
   const [selectedSeats, setSelectedSeats] = useState([]);
   const [bookedSeats, setBookedSeats] = useState([]);
+  const [heldSeats, setHeldSeats] = useState([]);
   const [loading, setLoading] = useState(false);
   const [error, setError] = useState(null);
   const [selectedTime, setSelectedTime] = useState('7:00 PM');
@@ -30,18 +31,6 @@ const Booking = () => {
     }
   };
 
-  // Fetch booked seats for current movie and showtime
-  const fetchBookedSeats = async () => {
-    if (!movie) return;
-    
-    try {
-      const data = await bookingsAPI.getBookedSeats(movie.id, selectedTime);
-      setBookedSeats(data.booked_seats);
-    } catch (err) {
-      console.error('Failed to fetch booked seats:', err);
-      setBookedSeats([]);
-    }
-  };
 
   useEffect(() => {
     if (!user) {
@@ -52,10 +41,66 @@ const Booking = () => {
     fetchMovieDetails();
   }, [movieId, user, navigate]);
 
+  const seatChannel = useRef(null);
+  // True once the seat channel has dropped; seats are then polled instead
+  const [channelDown, setChannelDown] = useState(false);
+
+  // Live seat map for the current movie and showtime; selecting a seat holds it
   useEffect(() => {
-    fetchBookedSeats();
+    if (!movie) return;
+    
+    setBookedSeats([]);
+    setHeldSeats([]);
+    setChannelDown(false);
+    const channel = bookingsAPI.openSeatChannel(movie.id, selectedTime, {
+      onSeats: (booked, held) => {
+        setBookedSeats(booked);
+        setHeldSeats(held);
+      },
+      onReleased: (seats) => {
+        // Our holds lapsed or were booked: the seats are no longer ours
+        setSelectedSeats((selected) => selected.filter((seat) => !seats.includes(seat)));
+      },
+      onAck: (reply) => {
+        if (reply.type !== 'ack' && reply.type !== 'selection') return;
+        setSelectedSeats(reply.selected);
+        if (reply.type === 'ack' && !reply.ok) setError(reply.error);
+      },
+      onClose: ({ code, reason }) => {
+        seatChannel.current = null;
+        setChannelDown(true);
+        setError(code === 1008
+          ? `${reason || 'Your session has expired'}. Please log in again to hold seats.`
+          : 'Live seat updates are unavailable; seat availability refreshes every few seconds.');
+      },
+    });
+    seatChannel.current = channel;
+    return () => channel.close();
   }, [movie, selectedTime]);
 
+  // Without the channel, poll the seat map (answered with 304 while unchanged)
+  useEffect(() => {
+    if (!movie || !channelDown) return;
+    
+    let cancelled = false;
+    const refresh = async () => {
+      try {
+        const data = await bookingsAPI.getBookedSeats(movie.id, selectedTime);
+        if (cancelled) return;
+        setBookedSeats(data.booked_seats);
+        setHeldSeats(data.held_seats || []);
+      } catch (err) {
+        // Keep the last seat map; the next poll retries
+      }
+    };
+    refresh();
+    const timer = setInterval(refresh, 5000);
+    return () => {
+      cancelled = true;
+      clearInterval(timer);
+    };
+  }, [movie, selectedTime, channelDown]);
+
   if (!movie) {
     return null;
   }
@@ -66,18 +111,28 @@ const Booking = () => {
   const generateSeatId = (row, number) => `${row}${number}`;
 
   const handleSeatClick = (seatId) => {
-    if (bookedSeats.includes(seatId)) return;
+    if (getSeatStatus(seatId) === 'booked') return;
 
-    setSelectedSeats(prev => 
-      prev.includes(seatId) 
-        ? prev.filter(id => id !== seatId)
-        : [...prev, seatId]
-    );
+    if (!seatChannel.current) {
+      // No channel: select locally, availability is checked at checkout
+      setSelectedSeats((selected) => selected.includes(seatId)
+        ? selected.filter((seat) => seat !== seatId)
+        : [...selected, seatId]);
+      return;
+    }
+    setError(null);
+    if (selectedSeats.includes(seatId)) {
+      seatChannel.current.deselect([seatId]);
+    } else {
+      seatChannel.current.select([seatId]);
+    }
   };
 
   const getSeatStatus = (seatId) => {
     if (bookedSeats.includes(seatId)) return 'booked';
     if (selectedSeats.includes(seatId)) return 'selected';
+    // Held by someone else: as good as booked until their hold lapses
+    if (heldSeats.includes(seatId)) return 'booked';
     return 'available';
   };
 
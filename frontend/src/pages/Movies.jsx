@@ -9,13 +9,16 @@ const Movies = () => {
   const [error, setError] = useState(null);
   const [selectedGenre, setSelectedGenre] = useState('All Genres');
   const [searchQuery, setSearchQuery] = useState('');
+  // The full search runs once typing pauses; suggestions follow every keystroke
+  const [debouncedQuery, setDebouncedQuery] = useState('');
+  const [suggestions, setSuggestions] = useState([]);
   const navigate = useNavigate();
 
   const fetchMovies = async () => {
     try {
       setLoading(true);
       setError(null);
-      const data = await moviesAPI.getAllMovies(selectedGenre, searchQuery);
+      const data = await moviesAPI.getAllMovies(selectedGenre, debouncedQuery);
       setMovies(data);
     } catch (err) {
       setError(err.message);
@@ -27,7 +30,24 @@ const Movies = () => {
 
   useEffect(() => {
     fetchMovies();
-  }, [selectedGenre, searchQuery]);
+  }, [selectedGenre, debouncedQuery]);
+
+  useEffect(() => {
+    const timer = setTimeout(() => setDebouncedQuery(searchQuery), 300);
+    return () => clearTimeout(timer);
+  }, [searchQuery]);
+
+  useEffect(() => {
+    if (!searchQuery.trim()) {
+      setSuggestions([]);
+      return;
+    }
+    let current = true;
+    moviesAPI.suggestMovies(searchQuery)
+      .then((data) => { if (current) setSuggestions(data); })
+      .catch(() => { if (current) setSuggestions([]); });
+    return () => { current = false; };
+  }, [searchQuery]);
 
   const handleGenreChange = (e) => {
     setSelectedGenre(e.target.value);
@@ -63,9 +83,15 @@ const Movies = () => {
               type="text" 
               value={searchQuery}
               onChange={handleSearchChange}
+              list="movie-suggestions"
               className="bg-dark-card text-white border border-dark-border rounded-lg px-4 py-2 text-sm w-52 focus:outline-none focus:border-brand-red placeholder-gray-500"
               placeholder="Search movies..."
             />
+            <datalist id="movie-suggestions">
+              {suggestions.map((movie) => (
+                <option key={movie.id} value={movie.title} />
+              ))}
+            </datalist>
           </div>
         </div>
         
@@ -69,9 +69,18 @@ export const moviesAPI = {
   getMovieById: async (movieId) => {
     return apiRequest(`/movies/${movieId}`);
   },
+
+  // Autocomplete for the search box: [{ id, title, rating }], best rated first
+  suggestMovies: async (prefix, limit = 8) => {
+    const params = new URLSearchParams({ prefix, limit: String(limit) });
+    return apiRequest(`/movies/suggest?${params.toString()}`);
+  },
 };
 
 // Bookings API
+// Last booked-seats response per showing, reused when the server answers 304
+const bookedSeatsCache = new Map();
+
 export const bookingsAPI = {
   createBooking: async (bookingData) => {
     return apiRequest('/bookings/', {
@@ -84,11 +93,85 @@ export const bookingsAPI = {
     return apiRequest('/bookings/');
   },
 
+  // Sends the last ETag for the showing, so an unchanged seat map costs a 304.
+  // Booking.jsx polls this when the seat channel is unavailable.
   getBookedSeats: async (movieId, showtime) => {
-    return apiRequest('/bookings/booked-seats', {
+    const key = `${movieId}|${showtime}`;
+    const cached = bookedSeatsCache.get(key);
+    const response = await fetch(`${API_BASE_URL}/bookings/booked-seats`, {
       method: 'POST',
+      headers: {
+        'Content-Type': 'application/json',
+        ...(cached ? { 'If-None-Match': cached.etag } : {}),
+      },
       body: JSON.stringify({ movie_id: movieId, showtime }),
     });
+    if (response.status === 304 && cached) {
+      return cached.data;
+    }
+    if (!response.ok) {
+      const error = await response.json().catch(() => ({ detail: 'Network error' }));
+      throw new Error(error.detail || 'API request failed');
+    }
+    const data = await response.json();
+    const etag = response.headers.get('ETag');
+    if (etag) {
+      bookedSeatsCache.set(key, { etag, data });
+    }
+    return data;
+  },
+
+  // Two-way seat selection for one showing over a WebSocket. Selecting a
+  // seat holds it on the server; handlers.onSeats(bookedSeats, heldSeats)
+  // runs on every change, handlers.onReleased(seats) when holds go away,
+  // handlers.onAck(reply) after each select or deselect (and with a
+  // "selection" message if some of the user's holds lapsed), and
+  // handlers.onClose({ code, reason }) if the channel drops or cannot
+  // open (code 1008: bad or expired login). Returns
+  // { select(seats), deselect(seats), close() }.
+  openSeatChannel: (movieId, showtime, handlers) => {
+    const params = new URLSearchParams({
+      movie_id: movieId,
+      showtime,
+      token: localStorage.getItem('talknbook_token') || '',
+    });
+    const socket = new WebSocket(`${API_BASE_URL.replace(/^http/, 'ws')}/bookings/ws?${params.toString()}`);
+    let booked = new Set();
+    let held = new Set();
+    let closedByClient = false;
+    socket.onmessage = (event) => {
+      const message = JSON.parse(event.data);
+      if (message.type === 'snapshot') {
+        booked = new Set(message.booked_seats);
+        held = new Set(message.held_seats);
+      } else if (message.type === 'delta') {
+        message.booked.forEach((seat) => booked.add(seat));
+        message.unbooked.forEach((seat) => booked.delete(seat));
+        message.held.forEach((seat) => held.add(seat));
+        message.released.forEach((seat) => held.delete(seat));
+        if (message.released.length) handlers.onReleased?.(message.released);
+      } else {
+        handlers.onAck?.(message);
+        return;
+      }
+      handlers.onSeats?.([...booked], [...held]);
+    };
+    // A failed connection fires error and then close; close reports both.
+    socket.onerror = () => {};
+    socket.onclose = (event) => {
+      if (!closedByClient) handlers.onClose?.({ code: event.code, reason: event.reason });
+    };
+    const send = (op, seats) => {
+      if (socket.readyState === WebSocket.OPEN) socket.send(JSON.stringify({ op, seats }));
+    };
+    return {
+      select: (seats) => send('select', seats),
+      deselect: (seats) => send('deselect', seats),
+      close: () => {
+        closedByClient = true;
+        socket.close();
+      },
+    };
   },
 
   getBookingById: async (bookingId) => {